@@ -0,0 +1,56 @@
+import glob
+import gzip
+import hashlib
+import os
+
+import brotli
+
+ASSETS_SOURCE_DIR = 'app/static'
+ASSETS_DIST_DIR = 'app/static_dist'
+ASSET_PATTERNS = ('style/*.css', 'js/*.js')
+
+# 'style/auth.css' -> 'style/auth.<hash>.css'
+manifest: dict[str, str] = {}
+# 'style/auth.<hash>.css' -> хэш содержимого, он же основа ETag
+hashed_assets: dict[str, str] = {}
+
+
+def build_assets():
+    # Шаг сборки на старте: имена с хэшем содержимого плюс заранее сжатые gzip/brotli копии
+    manifest.clear()
+    hashed_assets.clear()
+    for pattern in ASSET_PATTERNS:
+        for source_path in glob.glob(os.path.join(ASSETS_SOURCE_DIR, pattern)):
+            with open(source_path, 'rb') as source_file:
+                data = source_file.read()
+            digest = hashlib.sha256(data).hexdigest()[:12]
+
+            logical_path = os.path.relpath(source_path, ASSETS_SOURCE_DIR).replace(os.sep, '/')
+            stem, suffix = os.path.splitext(logical_path)
+            hashed_path = f'{stem}.{digest}{suffix}'
+
+            target_path = os.path.join(ASSETS_DIST_DIR, hashed_path)
+            if not os.path.exists(target_path):
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                _write(f'{target_path}.gz', gzip.compress(data, compresslevel=9, mtime=0))
+                _write(f'{target_path}.br', brotli.compress(data, quality=11))
+                # Основной файл пишем последним: его наличие означает, что сборка ассета завершена
+                _write(target_path, data)
+
+            manifest[logical_path] = hashed_path
+            hashed_assets[hashed_path] = digest
+
+
+def _write(path: str, data: bytes):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as target_file:
+        target_file.write(data)
+    os.replace(tmp_path, path)
+
+
+def asset_url(path: str) -> str:
+    # Jinja-хелпер: до сборки (или для неизвестного файла) отдаем обычный путь в /static
+    hashed_path = manifest.get(path)
+    if hashed_path is None:
+        return f'/static/{path}'
+    return f'/assets/{hashed_path}'
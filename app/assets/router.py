@@ -0,0 +1,40 @@
+import mimetypes
+import os
+
+from fastapi import APIRouter, Request, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.assets.build import ASSETS_DIST_DIR, hashed_assets
+from app.http_cache import accepted_encodings, etag_matches, not_modified
+
+router = APIRouter(prefix='/assets', tags=['Статика'])
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# В порядке предпочтения
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+@router.get("/{asset_path:path}", include_in_schema=False)
+async def get_asset(request: Request, asset_path: str):
+    digest = hashed_assets.get(asset_path)
+    if digest is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Файл не найден')
+
+    path = os.path.join(ASSETS_DIST_DIR, asset_path)
+    media_type = mimetypes.guess_type(asset_path)[0] or 'application/octet-stream'
+    headers = {'Cache-Control': IMMUTABLE, 'Vary': 'Accept-Encoding'}
+
+    accepted = accepted_encodings(request.headers.get('accept-encoding', ''))
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted:
+            path += suffix
+            headers['Content-Encoding'] = encoding
+            break
+
+    # У каждого варианта кодирования свой строгий ETag
+    etag = f'"{digest}-{headers.get("Content-Encoding", "identity")}"'
+    headers['ETag'] = etag
+    if etag_matches(request, etag):
+        return not_modified(etag, IMMUTABLE)
+
+    return FileResponse(path, media_type=media_type, headers=headers)
@@ -0,0 +1,107 @@
+import zlib
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.http_cache import accepted_encodings
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/x-ndjson', 'application/javascript')
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        # wbits=31 - поток в формате gzip, а не голый deflate
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self._compressor.process(data) + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class CompressionMiddleware:
+    # Сжимает ответы br или gzip по Accept-Encoding. Маленькие ответы, уже сжатые
+    # и несжимаемые типы (картинки) пропускает как есть; потоковые ответы сжимает по частям.
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get('accept-encoding', ''))
+        if 'br' in accepted:
+            encoding = 'br'
+        elif 'gzip' in accepted:
+            encoding = 'gzip'
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+    def make_compressor(self, encoding: str):
+        if encoding == 'br':
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, send, encoding: str):
+        self.middleware = middleware
+        self.send_next = send
+        self.encoding = encoding
+        self.start_message = None
+        self.compressor = None
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            # Заголовки держим до первого куска тела: только тогда ясно, сжимать ли ответ
+            self.start_message = message
+            return
+        if message['type'] != 'http.response.body':
+            await self.send_next(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.start_message is not None:
+            start_message, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start_message['headers'])
+            content_type = headers.get('content-type', '')
+            if ('content-encoding' in headers or not content_type.startswith(COMPRESSIBLE_TYPES)
+                    or (not more_body and len(body) < self.middleware.minimum_size)):
+                await self.send_next(start_message)
+                await self.send_next(message)
+                return
+
+            self.compressor = self.middleware.make_compressor(self.encoding)
+            headers['Content-Encoding'] = self.encoding
+            headers.add_vary_header('Accept-Encoding')
+            body = self.compressor.compress(body, final=not more_body)
+            if more_body:
+                del headers['Content-Length']
+            else:
+                headers['Content-Length'] = str(len(body))
+            await self.send_next(start_message)
+            await self.send_next({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+            return
+
+        if self.compressor is None:
+            await self.send_next(message)
+            return
+
+        body = self.compressor.compress(body, final=not more_body)
+        await self.send_next({'type': 'http.response.body', 'body': body, 'more_body': more_body})
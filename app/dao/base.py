@@ -1,6 +1,6 @@
 import sqlalchemy
-from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.future import select
+from app.dao.session import get_session, get_transaction
 from app.database import async_session_maker
 
 class BaseDAO:
@@ -8,68 +8,67 @@ class BaseDAO:
 
     @classmethod
     async def find_all(cls, **filter_by):
-        async with async_session_maker() as session:
+        async with get_session() as session:
             query = select(cls.model).filter_by(**filter_by)
             result = await session.execute(query)
             return result.scalars().all()
 
     @classmethod
     async def find_by_id(cls, data_id: int):
-        async with async_session_maker() as session:
+        async with get_session() as session:
             query = select(cls.model).filter_by(id=data_id)
             result = await session.execute(query)
             return result.scalar_one_or_none()
 
     @classmethod
     async def find_one_or_none(cls, **filter_by):
-        async with async_session_maker() as session:
+        async with get_session() as session:
             query = select(cls.model).filter_by(**filter_by)
             result = await session.execute(query)
             return result.scalar_one_or_none()
 
     @classmethod
-    async def add(cls, **values):
+    def export_query(cls, **filter_by):
+        return (
+            select(*cls.model.__table__.columns)
+            .where(*[getattr(cls.model, k) == v for k, v in filter_by.items()])
+            .order_by(cls.model.id)
+        )
+
+    @classmethod
+    async def stream_rows(cls, query, yield_per: int = 1000):
+        # Серверный курсор: строки-кортежи приходят порциями, без ORM-объектов.
+        # Отдельная сессия, потому что поток читается уже после завершения обработчика.
         async with async_session_maker() as session:
-            async with session.begin():
-                new_instance = cls.model(**values)
-                session.add(new_instance)
-                try:
-                    await session.commit()
-                except SQLAlchemyError as e:
-                    await session.rollback()
-                    raise e
-                return new_instance
+            result = await session.stream(query.execution_options(yield_per=yield_per))
+            async for rows in result.partitions():
+                yield rows
+
+    @classmethod
+    async def add(cls, **values):
+        async with get_transaction() as session:
+            new_instance = cls.model(**values)
+            session.add(new_instance)
+        return new_instance
 
     @classmethod
     async def update(cls, filter_by, **values):
-        async with async_session_maker() as session:
-            async with session.begin():
-                query = (
-                    sqlalchemy.update(cls.model)
-                    .where(*[getattr(cls.model, k) == v for k, v in filter_by.items()])
-                    .values(**values)
-                    .execution_options(synchronize_session="fetch")
-                )
-                result = await session.execute(query)
-                try:
-                    await session.commit()
-                except SQLAlchemyError as e:
-                    await session.rollback()
-                    raise e
-                return result.rowcount
+        async with get_transaction() as session:
+            query = (
+                sqlalchemy.update(cls.model)
+                .where(*[getattr(cls.model, k) == v for k, v in filter_by.items()])
+                .values(**values)
+                .execution_options(synchronize_session="fetch")
+            )
+            result = await session.execute(query)
+            return result.rowcount
 
     @classmethod
     async def delete(cls, delete_all: bool = False, **filter_by):
         if not delete_all and not filter_by:
             raise ValueError("Необходим хотя бы один параметр для операции удаления")
 
-        async with async_session_maker() as session:
-            async with session.begin():
-                query = sqlalchemy.delete(cls.model).filter_by(**filter_by)
-                result = await session.execute(query)
-                try:
-                    await session.commit()
-                except SQLAlchemyError as e:
-                    await session.rollback()
-                    raise e
-                return result.rowcount
\ No newline at end of file
+        async with get_transaction() as session:
+            query = sqlalchemy.delete(cls.model).filter_by(**filter_by)
+            result = await session.execute(query)
+            return result.rowcount
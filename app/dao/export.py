@@ -0,0 +1,16 @@
+import csv
+import io
+
+
+async def iter_csv(query, partitions):
+    # Пишем CSV порциями через один буфер: память не растет вместе с размером выгрузки
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in query.selected_columns])
+    yield buffer.getvalue()
+
+    async for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerows(rows)
+        yield buffer.getvalue()
@@ -0,0 +1,16 @@
+import base64
+import json
+
+
+# Курсор непрозрачен для клиента: внутри лежит id последней отданной записи
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Некорректный курсор") from e
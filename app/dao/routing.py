@@ -0,0 +1,119 @@
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import Insert, Update, Delete, TextClause
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+# True, если клиент недавно писал и должен читать с основного сервера
+_force_primary: ContextVar[bool] = ContextVar('force_primary', default=False)
+
+PRIMARY_COOKIE = 'db_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@contextmanager
+def use_primary():
+    # Чтения внутри блока идут на основной сервер, например для справочников, которые кэшируются надолго
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+class ReplicaPool:
+    # Реплики для чтения: выбираем по кругу среди тех, что прошли последнюю проверку
+    def __init__(self):
+        self.engines = []
+        self.healthy = []
+        self._counter = itertools.count()
+
+    def configure(self, engines):
+        self.engines = list(engines)
+        self.healthy = list(engines)
+
+    def choose(self):
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    async def check(self):
+        healthy = []
+        for engine in self.engines:
+            try:
+                async with engine.connect() as connection:
+                    await connection.execute(text('SELECT 1'))
+                healthy.append(engine)
+            except Exception:
+                logger.warning("Реплика %s недоступна, чтения идут на другие серверы", engine.url.host)
+        self.healthy = healthy
+
+    async def run_health_checks(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.check()
+
+
+replica_pool = ReplicaPool()
+
+
+class RoutingSession(Session):
+    # Запись, SELECT ... FOR UPDATE, сырой SQL и все после первой записи в сессии - на основной сервер,
+    # остальные чтения - на одну выбранную для сессии реплику
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primary = super().get_bind(mapper, clause=clause, **kw)
+        if self._flushing or isinstance(clause, (Insert, Update, Delete, TextClause)):
+            self.info['wrote'] = True
+            return primary
+        if (self.info.get('wrote') or _force_primary.get()
+                or getattr(clause, '_for_update_arg', None) is not None):
+            return primary
+
+        # Реплику выбираем один раз на сессию: одна сессия - один запрос, одно соединение
+        # и одна точка репликации, иначе ETag и тело ответа могли бы прийти с разных реплик
+        read_bind = self.info.get('read_bind')
+        if read_bind is None:
+            replica = replica_pool.choose()
+            read_bind = self.info['read_bind'] = replica.sync_engine if replica is not None else primary
+        return read_bind
+
+
+class ReadYourWritesMiddleware:
+    # После записи клиент window секунд читает с основного сервера, пока реплики догоняют.
+    # Окно передается в cookie, поэтому работает на всех воркерах.
+    def __init__(self, app, window: float):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        now = time.time()
+        try:
+            primary_until = float(Request(scope).cookies.get(PRIMARY_COOKIE, 0))
+        except ValueError:
+            primary_until = 0
+        token = _force_primary.set(primary_until > now)
+
+        async def send_with_cookie(message):
+            if message['type'] == 'http.response.start' and scope['method'] not in SAFE_METHODS:
+                cookie = (f'{PRIMARY_COOKIE}={now + self.window:.3f}; Max-Age={int(self.window) + 1}; '
+                          f'Path=/; HttpOnly; SameSite=Lax')
+                message['headers'] = [*message['headers'], (b'set-cookie', cookie.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _force_primary.reset(token)
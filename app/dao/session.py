@@ -0,0 +1,72 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker
+
+_request_session: ContextVar[AsyncSession | None] = ContextVar('request_session', default=None)
+
+
+async def request_session():
+    # FastAPI-зависимость: одна сессия, одно соединение и одна транзакция на весь запрос.
+    # Фиксируем изменения после обработчика, при любой ошибке откатываем.
+    async with async_session_maker() as session:
+        token = _request_session.set(session)
+        try:
+            yield session
+            await session.commit()
+            for callback in session.info.pop('after_commit', ()):
+                callback()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            _request_session.reset(token)
+
+
+def call_after_commit(callback):
+    # Сброс кэшей и прочие побочные эффекты записи - только после фиксации транзакции запроса,
+    # иначе параллельный запрос успеет перечитать еще не зафиксированные данные и закэшировать их.
+    # Вне запроса DAO фиксирует транзакцию сам до возврата, поэтому вызываем сразу.
+    session = _request_session.get()
+    if session is None:
+        callback()
+        return
+    session.info.setdefault('after_commit', []).append(callback)
+
+
+@contextmanager
+def outside_request_session():
+    # DAO внутри блока открывают собственную короткую сессию: соединение возвращается в пул сразу
+    # после запроса к БД, а не удерживается транзакцией HTTP-запроса (например, пока считается bcrypt)
+    token = _request_session.set(None)
+    try:
+        yield
+    finally:
+        _request_session.reset(token)
+
+
+@asynccontextmanager
+async def get_session():
+    session = _request_session.get()
+    if session is not None:
+        yield session
+        return
+
+    async with async_session_maker() as session:
+        yield session
+
+
+@asynccontextmanager
+async def get_transaction():
+    session = _request_session.get()
+    if session is not None:
+        # Транзакцию запроса фиксирует request_session, здесь только отправляем изменения в БД
+        yield session
+        await session.flush()
+        return
+
+    async with async_session_maker() as session:
+        async with session.begin():
+            yield session
@@ -1,15 +1,80 @@
+import time
 from datetime import datetime
 from typing import Annotated
 
 from sqlalchemy import func
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, declared_attr, Mapped, mapped_column
-from app.config import get_db_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.config import get_db_url, get_engine_options, get_replica_urls, settings
+from app.dao.routing import RoutingSession, replica_pool
+from app.monitoring.metrics import track_sql
+from app.monitoring.queries import track_queries
+
+
+class PoolStats:
+    def __init__(self):
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def record_wait(self, seconds: float):
+        self.waits += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            "waits": self.waits,
+            "wait_avg_ms": round(self.wait_total / self.waits * 1000, 3) if self.waits else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "timeouts": self.timeouts,
+        }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        # Замеряем, сколько запрос ждал свободное соединение из пула
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.record_wait(time.perf_counter() - start)
+
+
+def pool_status(engine) -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # overflow() отрицателен, пока пул не заполнен до pool_size
+        "overflow": max(pool.overflow(), 0),
+        **pool.stats.to_dict(),
+    }
 
 
 DATABASE_URL = get_db_url()
-engine = create_async_engine(DATABASE_URL)
-async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+engine = create_async_engine(DATABASE_URL, poolclass=InstrumentedQueuePool, **get_engine_options())
+replica_engines = [create_async_engine(url, poolclass=InstrumentedQueuePool, **get_engine_options())
+                   for url in get_replica_urls()]
+replica_pool.configure(replica_engines)
+if settings.METRICS_ENABLED:
+    for instrumented_engine in (engine, *replica_engines):
+        track_sql(instrumented_engine)
+if settings.QUERY_DETECTOR_ENABLED:
+    for instrumented_engine in (engine, *replica_engines):
+        track_queries(instrumented_engine, settings.SLOW_QUERY_THRESHOLD)
+async_session_maker = async_sessionmaker(engine, expire_on_commit=False, sync_session_class=RoutingSession)
 
 # настройка аннотаций
 int_pk = Annotated[int, mapped_column(primary_key=True)]
@@ -26,4 +91,4 @@ class Base(AsyncAttrs, DeclarativeBase):
         return f"{cls.__name__.lower()}s"
 
     created_at: Mapped[created_at]
-    updated_at: Mapped[updated_at]
\ No newline at end of file
+    updated_at: Mapped[updated_at]
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+
+from app.config import settings
+from app.dao.routing import replica_pool
+from app.database import engine, pool_status
+from app.majors.cache import majors_cache
+from app.users.cache import users_cache
+
+router = APIRouter(prefix='/health', tags=['Мониторинг'])
+
+
+@router.get("/db", summary="Состояние пула соединений с БД")
+async def get_db_health() -> dict:
+    replicas = [{"host": replica.url.host, "healthy": replica in replica_pool.healthy, **pool_status(replica)}
+                for replica in replica_pool.engines]
+    return {**pool_status(engine), "max_overflow": settings.DB_MAX_OVERFLOW, "replicas": replicas}
+
+
+@router.get("/cache", summary="Статистика кэшей")
+async def get_cache_health() -> dict:
+    return {"users": users_cache.stats(), "majors": majors_cache.stats()}
@@ -0,0 +1,37 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def accepted_encodings(header: str) -> set[str]:
+    # Разбор Accept-Encoding без весов: кодировки с q=0 явно запрещены клиентом
+    accepted = set()
+    for item in header.split(','):
+        token, _, params = item.partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(token.strip().lower())
+    return accepted
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # Для If-None-Match сравнение слабое: W/"x" и "x" считаются одним тегом
+    tags = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+    return etag.removeprefix('W/') in tags
+
+
+def weak_etag(*parts) -> str:
+    # Слабый тег: тело может отличаться побайтно (сжатие, порядок ключей), но не по смыслу
+    digest = hashlib.blake2b('|'.join(map(str, parts)).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def not_modified(etag: str, cache_control: str | None = None) -> Response:
+    headers = {'ETag': etag}
+    if cache_control:
+        headers['Cache-Control'] = cache_control
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
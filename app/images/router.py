@@ -0,0 +1,54 @@
+import os
+import re
+from typing import Literal
+
+import anyio
+from fastapi import APIRouter, Request, HTTPException, status
+from fastapi.responses import FileResponse
+from PIL import Image
+
+from app.http_cache import etag_matches, not_modified
+from app.images.variants import image_variants, VARIANT_SIZES
+from app.students.photos import PHOTOS_DIR
+
+router = APIRouter(prefix='/images', tags=['Изображения'])
+
+PHOTO_NAME = re.compile(r'^[A-Za-z0-9_-]+\.webp$')
+CONTENT_HASH = re.compile(r'^[0-9a-f]{64}$')
+
+
+@router.get("/{photo_name}", summary="Фото студента в нужном размере")
+async def get_image(request: Request, photo_name: str, size: Literal['thumb', 'card', 'full'] = 'full'):
+    if not PHOTO_NAME.match(photo_name):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Фото не найдено')
+
+    source_path = os.path.join(PHOTOS_DIR, photo_name)
+    try:
+        source_stat = await anyio.Path(source_path).stat()
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Фото не найдено')
+
+    stem = photo_name.removesuffix('.webp')
+    if CONTENT_HASH.match(stem):
+        # Имя - хэш содержимого: файл никогда не меняется, кэшировать можно навсегда
+        version = f'{stem}-{size}'
+        cache_control = 'public, max-age=31536000, immutable'
+    else:
+        # Старые фото вида <id>.webp могут перезаписываться, версию берем из mtime и размера
+        version = f'{stem}-{source_stat.st_mtime_ns:x}-{source_stat.st_size:x}-{size}'
+        cache_control = 'public, max-age=86400'
+    etag = f'"{version}"'
+
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+
+    path = source_path
+    if size != 'full':
+        try:
+            path = await image_variants.get(source_path, f'{version}.webp', VARIANT_SIZES[size])
+        except (OSError, Image.DecompressionBombError):
+            # DecompressionBombError не наследует OSError: картинка с огромным числом пикселей
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                                detail='Файл не является изображением')
+
+    return FileResponse(path, media_type='image/webp', headers={'ETag': etag, 'Cache-Control': cache_control})
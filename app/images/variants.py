@@ -0,0 +1,109 @@
+import asyncio
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image
+
+from app.config import settings
+
+# Сторона квадрата, в который вписывается вариант; full отдается как есть
+VARIANT_SIZES = {'thumb': 96, 'card': 320}
+
+
+def render_variant(source_path: str, target_path: str, size: int):
+    # Выполняется в отдельном процессе: Pillow держит GIL на время ресайза
+    tmp_path = f'{target_path}.{os.getpid()}.tmp'
+    with Image.open(source_path) as image:
+        image.thumbnail((size, size))
+        image.save(tmp_path, format='WEBP', quality=80)
+    os.replace(tmp_path, target_path)
+
+
+class VariantCache:
+    # Дисковый кэш уменьшенных копий с вытеснением давно не использованных по суммарному объему
+    def __init__(self, directory: str, max_bytes: int, workers: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.total_bytes = 0
+        self._files: OrderedDict[str, int] = OrderedDict()
+        self._pending: dict[str, asyncio.Future] = {}
+        self._executor: ProcessPoolExecutor | None = None
+
+    def load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        entries = [entry for entry in os.scandir(self.directory)
+                   if entry.is_file() and not entry.name.endswith('.tmp')]
+        # Порядок LRU переживает перезапуск: при каждом обращении файлу обновляется mtime
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            self._files[entry.name] = entry.stat().st_size
+            self.total_bytes += entry.stat().st_size
+        self._evict()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+    async def get(self, source_path: str, name: str, size: int) -> str:
+        path = os.path.join(self.directory, name)
+        if name in self._files:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                # Файл удалили с диска в обход кэша - забываем запись и генерируем заново
+                self.total_bytes -= self._files.pop(name)
+            else:
+                self._files.move_to_end(name)
+                return path
+
+        # Один и тот же вариант, запрошенный параллельно, генерируем один раз
+        task = self._pending.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self._render(source_path, path, name, size))
+            task.add_done_callback(lambda _: self._pending.pop(name, None))
+            self._pending[name] = task
+        # shield: отключившийся клиент не отменяет генерацию для остальных
+        await asyncio.shield(task)
+        return path
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def _replace_broken(self, executor: ProcessPoolExecutor):
+        # Параллельные генерации видят один и тот же сломанный пул, пересоздает его только первая
+        if self._executor is executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _render(self, source_path: str, path: str, name: str, size: int):
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            await loop.run_in_executor(executor, render_variant, source_path, path, size)
+        except BrokenProcessPool:
+            # Рабочий процесс упал (OOM, сигнал) - пул больше не принимает задачи, повторяем один раз в новом
+            self._replace_broken(executor)
+            await loop.run_in_executor(self._get_executor(), render_variant, source_path, path, size)
+        self._files[name] = os.path.getsize(path)
+        self.total_bytes += self._files[name]
+        self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self._files) > 1:
+            name, size = self._files.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+
+image_variants = VariantCache(directory=settings.IMAGE_VARIANTS_DIR,
+                              max_bytes=settings.IMAGE_VARIANTS_MAX_BYTES,
+                              workers=settings.IMAGE_WORKERS)
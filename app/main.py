@@ -1,11 +1,65 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends
+from fastapi.responses import ORJSONResponse
+from app.assets.build import build_assets
+from app.assets.router import router as router_assets
+from app.compression import CompressionMiddleware
+from app.config import settings
+from app.dao.routing import ReadYourWritesMiddleware, replica_pool
+from app.dao.session import request_session
+from app.database import replica_engines
+from app.majors.cache import majors_cache
+from app.majors.counters import run_major_deltas_folding
+from app.monitoring.metrics import MetricsMiddleware, metrics_registry
+from app.monitoring.queries import QueryDetectorMiddleware
 from app.students.router import router as router_students
 from app.majors.router import router as router_majors
 from app.users.router import router as router_users
 from app.pages.router import router as router_pages
+from app.health.router import router as router_health
+from app.images.router import router as router_images
+from app.images.variants import image_variants
+from app.monitoring.router import router as router_monitoring
+from app.stats.router import router as router_stats
 from fastapi.staticfiles import StaticFiles
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    build_assets()
+    try:
+        await majors_cache.refresh()
+    except Exception:
+        # Без БД на старте не падаем: справочник загрузится при первом обращении
+        logger.exception("Не удалось прогреть справочник факультетов")
+    image_variants.load()
+    folding = asyncio.create_task(run_major_deltas_folding(settings.MAJOR_COUNTER_FOLD_INTERVAL))
+    replica_checks = asyncio.create_task(replica_pool.run_health_checks(settings.DB_REPLICA_CHECK_INTERVAL))
+    yield
+    folding.cancel()
+    replica_checks.cancel()
+    # Дожидаемся отмены, чтобы задачи не обрывались посреди запроса к уже закрываемому пулу
+    await asyncio.gather(folding, replica_checks, return_exceptions=True)
+    image_variants.shutdown()
+
+
+# Все DAO внутри запроса работают через одну сессию и одну транзакцию
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(request_session)], default_response_class=ORJSONResponse)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE,
+                   gzip_level=settings.GZIP_LEVEL, brotli_quality=settings.BROTLI_QUALITY)
+if replica_engines:
+    app.add_middleware(ReadYourWritesMiddleware, window=settings.DB_READ_YOUR_WRITES_WINDOW)
+if settings.QUERY_DETECTOR_ENABLED:
+    app.add_middleware(QueryDetectorMiddleware, threshold=settings.QUERY_REPEAT_THRESHOLD,
+                       raise_on_repeat=settings.QUERY_REPEAT_RAISE)
+# Добавлен последним, значит внешний: в латентность входит и сжатие ответа
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics_registry)
 
 app.mount('/static', StaticFiles(directory='app/static'), 'static')
 
@@ -17,3 +71,8 @@ app.include_router(router_students)
 app.include_router(router_majors)
 app.include_router(router_users)
 app.include_router(router_pages)
+app.include_router(router_health)
+app.include_router(router_images)
+app.include_router(router_assets)
+app.include_router(router_monitoring)
+app.include_router(router_stats)
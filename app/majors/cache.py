@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from app.config import settings
+from app.dao.routing import use_primary
+from app.http_cache import weak_etag
+from app.majors.dao import MajorsDAO
+from app.majors.schemas import SchemaMajor
+
+
+class MajorsCache:
+    # Справочник факультетов в памяти процесса: id -> данные факультета.
+    # Обработчики записи сбрасывают его, TTL страхует от изменений из других процессов.
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._majors: dict[int, dict] = {}
+        self._etag = weak_etag(0, None)
+        self._loaded_at: float | None = None
+        # Растет при каждом сбросе: загрузка, начатая до сброса, не считается свежей
+        self._generation = 0
+        # Число завершенных загрузок: ждавшим блокировку видно, что справочник уже перечитали
+        self._loads = 0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    async def refresh(self, force: bool = True, needed_ids=()):
+        # needed_ids - факультеты, ради которых перечитываем: если их уже подгрузили, второй раз не идем в БД
+        loads = self._loads
+        async with self._lock:
+            # Пока ждали блокировку, справочник мог загрузить другой запрос
+            if not force and self._is_fresh():
+                return
+            if needed_ids and (loads != self._loads or all(major_id in self._majors for major_id in needed_ids)):
+                return
+            # Сразу после изменения реплика может отставать, а загруженное живет до TTL - читаем с основного
+            generation = self._generation
+            with use_primary():
+                majors = await MajorsDAO.find_all()
+            self._majors = {major.id: SchemaMajor.model_validate(major).model_dump() for major in majors}
+            # Версия справочника для ETag: число факультетов и самое позднее изменение
+            self._etag = weak_etag(len(majors), max((major.updated_at for major in majors), default=None))
+            self._loaded_at = time.monotonic() if generation == self._generation else None
+            self._loads += 1
+
+    async def _ensure_loaded(self):
+        if self._is_fresh():
+            self.hits += 1
+            return
+        self.misses += 1
+        await self.refresh(force=False)
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._majors),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / requests, 4) if requests else 0.0,
+        }
+
+    def invalidate(self):
+        self._generation += 1
+        self._loaded_at = None
+
+    async def get_all(self) -> list[dict]:
+        await self._ensure_loaded()
+        return list(self._majors.values())
+
+    async def get_snapshot(self) -> tuple[str, list[dict]]:
+        # ETag и данные из одной загрузки справочника
+        await self._ensure_loaded()
+        return self._etag, list(self._majors.values())
+
+    async def get_names(self, major_ids) -> dict[int, str]:
+        await self._ensure_loaded()
+        missing = [major_id for major_id in major_ids if major_id not in self._majors]
+        if missing:
+            # Факультет мог появиться в другом процессе - перечитываем справочник один раз на всех ждущих
+            await self.refresh(needed_ids=missing)
+        return {major_id: self._majors[major_id]['major_name']
+                for major_id in major_ids if major_id in self._majors}
+
+
+majors_cache = MajorsCache(ttl=settings.MAJORS_CACHE_TTL)
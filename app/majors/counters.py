@@ -0,0 +1,52 @@
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from app.database import async_session_maker
+from app.majors.cache import majors_cache
+from app.majors.models import MajorCountDelta
+
+logger = logging.getLogger(__name__)
+
+# Одним выражением забираем накопленные дельты и применяем суммы к факультетам.
+# Параллельный запуск безопасен: уже удаленные другим процессом строки DELETE пропустит.
+FOLD_MAJOR_DELTAS = text("""
+    WITH folded AS (
+        DELETE FROM major_count_deltas RETURNING major_id, delta
+    ), totals AS (
+        SELECT major_id, sum(delta) AS delta FROM folded GROUP BY major_id
+    )
+    UPDATE majors
+    SET count_students = majors.count_students + totals.delta, updated_at = now()
+    FROM totals
+    WHERE majors.id = totals.major_id AND totals.delta <> 0
+""")
+
+
+def major_delta_rows(deltas: dict[int, int]) -> list[dict]:
+    return [{"major_id": major_id, "delta": delta} for major_id, delta in deltas.items() if delta]
+
+
+async def record_major_deltas(session, deltas: dict[int, int]):
+    rows = major_delta_rows(deltas)
+    if rows:
+        await session.execute(MajorCountDelta.__table__.insert(), rows)
+
+
+async def fold_major_deltas() -> int:
+    async with async_session_maker() as session:
+        async with session.begin():
+            result = await session.execute(FOLD_MAJOR_DELTAS)
+            return result.rowcount
+
+
+async def run_major_deltas_folding(interval: float):
+    while True:
+        try:
+            if await fold_major_deltas():
+                # Счетчики в справочнике устарели - перечитаем его при следующем обращении
+                majors_cache.invalidate()
+        except Exception:
+            logger.exception("Не удалось свернуть дельты счетчиков факультетов")
+        await asyncio.sleep(interval)
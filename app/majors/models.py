@@ -1,4 +1,4 @@
-from sqlalchemy import text
+from sqlalchemy import ForeignKey, text
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base, str_uniq, int_pk, str_null_true
 
@@ -13,4 +13,14 @@ class Major(Base):
         return f"{self.__class__.__name__}(id={self.id}, major_name={self.major_name!r})"
 
     def __repr__(self):
-        return str(self)
\ No newline at end of file
+        return str(self)
+
+
+# Изменения count_students копятся здесь и периодически сворачиваются в majors,
+# чтобы массовые вставки студентов не упирались в блокировку одной строки факультета
+class MajorCountDelta(Base):
+    __tablename__ = 'major_count_deltas'
+
+    id: Mapped[int_pk]
+    major_id: Mapped[int] = mapped_column(ForeignKey("majors.id", ondelete="CASCADE"), nullable=False)
+    delta: Mapped[int]
@@ -1,20 +1,35 @@
 from typing import List
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse, ORJSONResponse
 
+from app.dao.export import iter_csv
+from app.dao.session import call_after_commit
+from app.http_cache import etag_matches, not_modified
+from app.majors.cache import majors_cache
 from app.majors.dao import MajorsDAO
 from app.majors.schemas import SchemaMajorAdd, SchemaMajorUpdate, SchemaMajor
 
 router = APIRouter(prefix="/majors", tags=["Работа с факультетами"])
 
-@router.get("/", summary="Получить все факультеты")
-async def get_majors() -> List[SchemaMajor]:
-    majors = await MajorsDAO.find_all()
-    return  majors
+@router.get("/", summary="Получить все факультеты", response_model=List[SchemaMajor])
+async def get_majors(request: Request):
+    etag, majors = await majors_cache.get_snapshot()
+    if etag_matches(request, etag):
+        return not_modified(etag, 'no-cache')
+    # Справочник уже провалидирован SchemaMajor при загрузке в кэш
+    return ORJSONResponse(majors, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+
+@router.get("/export.csv", summary="Выгрузить факультеты в CSV")
+async def export_majors_csv():
+    query = MajorsDAO.export_query()
+    return StreamingResponse(iter_csv(query, MajorsDAO.stream_rows(query)), media_type='text/csv',
+                             headers={'Content-Disposition': 'attachment; filename="majors.csv"'})
 
 @router.post("/add/", summary="Добавить новый факультет")
 async def add_major(major: SchemaMajorAdd) -> dict:
     check = await MajorsDAO.add(**major.dict())
+    call_after_commit(majors_cache.invalidate)
     if check:
         return {"message": "Факультет был успешно добавлен!", "major": major}
     return {"message": "Произошла ошибка при добавлении нового факультета!"}
@@ -25,6 +40,7 @@ async def update_major_desc(major: SchemaMajorUpdate) -> dict:
         filter_by={"major_name": major.major_name},
         major_description=major.major_description
     )
+    call_after_commit(majors_cache.invalidate)
 
     if check:
         return {"message": "Описание факультета было успешно изменено!", "major": major}
@@ -33,6 +49,7 @@ async def update_major_desc(major: SchemaMajorUpdate) -> dict:
 @router.delete("/major/{major_id}", summary="Удалить факультет по id")
 async def delete_major(major_id: int) -> dict:
     check = await MajorsDAO.delete(id=major_id)
+    call_after_commit(majors_cache.invalidate)
 
     if check:
         return {"message": f"Факультет с id {major_id} был удален!"}
@@ -12,7 +12,7 @@ sys.path.insert(0, dirname(dirname(abspath(__file__))))
 
 from app.database import DATABASE_URL, Base
 from app.students.models import Student
-from app.majors.models import Major
+from app.majors.models import Major, MajorCountDelta
 from app.users.models import User
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,37 @@
+"""Add student filter indexes
+
+Revision ID: a84d2e6c1f07
+Revises: 3f1c9a7e2b54
+Create Date: 2026-10-18 15:21:08.271828
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a84d2e6c1f07'
+down_revision: Union[str, None] = '3f1c9a7e2b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('ix_students_major_id_course_enrollment_year', ['major_id', 'course', 'enrollment_year']),
+    ('ix_students_course_enrollment_year', ['course', 'enrollment_year']),
+    ('ix_students_enrollment_year_major_id', ['enrollment_year', 'major_id']),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY не блокирует запись в таблицу, но не может идти внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'students', columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.drop_index(name, table_name='students', postgresql_concurrently=True)
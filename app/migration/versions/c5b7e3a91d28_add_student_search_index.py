@@ -0,0 +1,33 @@
+"""Add student search index
+
+Revision ID: c5b7e3a91d28
+Revises: a84d2e6c1f07
+Create Date: 2026-10-18 16:47:12.577215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5b7e3a91d28'
+down_revision: Union[str, None] = 'a84d2e6c1f07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Выражение должно совпадать с SEARCH_DOCUMENT в app/students/dao.py
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY ix_students_search_trgm ON students USING gin "
+            "(lower(first_name || ' ' || last_name || ' ' || email || ' ' || phone_number) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_students_search_trgm")
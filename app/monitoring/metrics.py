@@ -0,0 +1,178 @@
+import bisect
+import logging
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class RequestMetrics:
+    __slots__ = ('sql_count', 'sql_time', 'overhead')
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        # Время, проведенное в самих хуках и обвязке middleware
+        self.overhead = 0.0
+
+
+_request_metrics: ContextVar[RequestMetrics | None] = ContextVar('request_metrics', default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+class Histogram:
+    # Гистограмма в формате Prometheus: накопительные бакеты, сумма и количество на набор меток
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            # [счетчики по бакетам + "+Inf", сумма]
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, total) in self._series.items():
+            labels = dict(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{format_labels({**labels, "le": bound})} {cumulative}')
+            lines.append(f'{self.name}_sum{format_labels(labels)} {total}')
+            lines.append(f'{self.name}_count{format_labels(labels)} {cumulative}')
+        return lines
+
+
+def render_gauge(name: str, documentation: str, samples: list[tuple[dict, float]], kind: str = 'gauge') -> list[str]:
+    lines = [f'# HELP {name} {documentation}', f'# TYPE {name} {kind}']
+    lines.extend(f'{name}{format_labels(labels)} {value}' for labels, value in samples)
+    return lines
+
+
+class MetricsRegistry:
+    def __init__(self, overhead_budget: float):
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Время обработки HTTP-запроса', ('method', 'route', 'status'))
+        self.request_sql_queries = Histogram(
+            'http_request_sql_queries', 'Число SQL-запросов на HTTP-запрос', ('method', 'route'), SQL_COUNT_BUCKETS)
+        self.request_sql_duration = Histogram(
+            'http_request_sql_duration_seconds', 'Суммарное время SQL на HTTP-запрос', ('method', 'route'))
+        self.overhead_budget = overhead_budget
+        self.overhead_total = 0.0
+        self.overhead_max = 0.0
+        self.requests = 0
+        self._over_budget_logged = False
+
+    def record_request(self, method: str, route: str, status: int, duration: float, request_metrics: RequestMetrics,
+                       finished: float):
+        self.request_duration.observe(duration, method, route, status)
+        self.request_sql_queries.observe(request_metrics.sql_count, method, route)
+        self.request_sql_duration.observe(request_metrics.sql_time, method, route)
+
+        # Собственная стоимость учета: хуки на каждый SQL-запрос, подготовка в middleware
+        # и все после возврата из приложения (finished), включая эту запись
+        overhead = request_metrics.overhead + time.perf_counter() - finished
+        self.requests += 1
+        self.overhead_total += overhead
+        self.overhead_max = max(self.overhead_max, overhead)
+        if not self._over_budget_logged and self.overhead_total / self.requests > self.overhead_budget:
+            self._over_budget_logged = True
+            logger.warning("Учет метрик в среднем занимает %.1f мкс на запрос при бюджете %.1f мкс",
+                           self.overhead_total / self.requests * 1e6, self.overhead_budget * 1e6)
+
+    def render(self) -> list[str]:
+        lines = [
+            *self.request_duration.render(),
+            *self.request_sql_queries.render(),
+            *self.request_sql_duration.render(),
+            *render_gauge('http_metrics_overhead_seconds', 'Суммарное время учета метрик',
+                          [({}, self.overhead_total)], 'counter'),
+            *render_gauge('http_metrics_overhead_max_seconds', 'Максимальное время учета метрик на запрос',
+                          [({}, self.overhead_max)]),
+            *render_gauge('http_metrics_overhead_budget_seconds', 'Бюджет времени учета метрик на запрос',
+                          [({}, self.overhead_budget)]),
+        ]
+        return lines
+
+
+def track_sql(engine):
+    # Число и время SQL-запросов приписываются HTTP-запросу, в контексте которого они выполнены
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        entered = time.perf_counter()
+        request_metrics = _request_metrics.get()
+        if request_metrics is not None:
+            query_start = time.perf_counter()
+            conn.info.setdefault('query_start', []).append(query_start)
+            request_metrics.overhead += query_start - entered
+
+    @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        query_end = time.perf_counter()
+        request_metrics = _request_metrics.get()
+        if request_metrics is None or not conn.info.get('query_start'):
+            return
+        request_metrics.sql_count += 1
+        request_metrics.sql_time += query_end - conn.info['query_start'].pop()
+        request_metrics.overhead += time.perf_counter() - query_end
+
+
+class MetricsMiddleware:
+    # Латентность по маршрутам и статусам. Маршрут берется из шаблона пути (/students/{student_id}),
+    # а не из самого пути, чтобы число временных рядов не росло с числом студентов.
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        request_metrics = RequestMetrics()
+        token = _request_metrics.set(request_metrics)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        request_metrics.overhead += time.perf_counter() - started
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            finished = time.perf_counter()
+            _request_metrics.reset(token)
+            # Для смонтированных приложений (/static) маршрута нет, берем точку монтирования
+            route = getattr(scope.get('route'), 'path', None) or scope.get('root_path') or 'unmatched'
+            self.registry.record_request(scope['method'], route, status, finished - started, request_metrics,
+                                         finished)
+
+
+metrics_registry = MetricsRegistry(settings.METRICS_OVERHEAD_BUDGET)
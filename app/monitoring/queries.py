@@ -0,0 +1,141 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# asyncpg-параметры приходят с приведением типа: $1::INTEGER, $2::TIMESTAMP WITHOUT TIME ZONE
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\$\d+(?:::\w+(?: WITH(?:OUT)? TIME ZONE)?(?:\[\])?)?|%\(\w+\)s|\b\d+(?:\.\d+)?\b")
+_VALUE_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+class NPlusOneError(RuntimeError):
+    pass
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    # Форма запроса без значений: IN ($1, $2, $3) и IN ($1) дают один и тот же отпечаток
+    shape = _LITERALS.sub('?', statement)
+    shape = _VALUE_LISTS.sub('(?+)', shape)
+    return _SPACES.sub(' ', shape).strip()
+
+
+class QueryTracker:
+    def __init__(self, threshold: int, raise_on_repeat: bool, scope: dict | None = None, route: str | None = None):
+        self.threshold = threshold
+        self.raise_on_repeat = raise_on_repeat
+        self.scope = scope
+        self._route = route
+        self.counts = Counter()
+        self.suspended = 0
+
+    @property
+    def route(self) -> str:
+        if self._route is not None:
+            return self._route
+        if self.scope is None:
+            return '-'
+        route = getattr(self.scope.get('route'), 'path', None) or self.scope['path']
+        return f"{self.scope['method']} {route}"
+
+    def record(self, statement: str):
+        if self.suspended:
+            return
+        shape = fingerprint(statement)
+        self.counts[shape] += 1
+        if self.raise_on_repeat and self.counts[shape] == self.threshold + 1:
+            raise NPlusOneError(f'{self.route}: запрос выполнен больше {self.threshold} раз: {shape}')
+
+    def repeated(self) -> dict[str, int]:
+        return {shape: count for shape, count in self.counts.items() if count > self.threshold}
+
+    def report(self):
+        for shape, count in self.repeated().items():
+            logger.warning("Возможный N+1 в %s: запрос выполнен %d раз: %s", self.route, count, shape)
+
+    def assert_no_n_plus_one(self):
+        repeated = self.repeated()
+        if repeated:
+            details = '; '.join(f'{count}x {shape}' for shape, count in repeated.items())
+            raise NPlusOneError(f'{self.route}: повторяющиеся запросы: {details}')
+
+
+_query_tracker: ContextVar[QueryTracker | None] = ContextVar('query_tracker', default=None)
+
+
+@contextmanager
+def inspect_queries(route: str = '-', threshold: int = 10, raise_on_repeat: bool = False):
+    # Для тестов и скриптов вне HTTP-запроса: with inspect_queries() as tracker: ...; tracker.assert_no_n_plus_one()
+    tracker = QueryTracker(threshold, raise_on_repeat, route=route)
+    token = _query_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _query_tracker.reset(token)
+
+
+@contextmanager
+def allow_repeated_queries():
+    # Для мест, где одинаковые запросы повторяются намеренно (пачки bulk-вставки)
+    tracker = _query_tracker.get()
+    if tracker is not None:
+        tracker.suspended += 1
+    try:
+        yield
+    finally:
+        if tracker is not None:
+            tracker.suspended -= 1
+
+
+def track_queries(engine, slow_threshold: float):
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('detector_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('detector_start')
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        tracker = _query_tracker.get()
+        if duration > slow_threshold:
+            logger.warning("Медленный запрос %.1f мс в %s: %s; параметры: %.1000r", duration * 1000,
+                           tracker.route if tracker else '-', statement, parameters)
+        if tracker is not None:
+            tracker.record(statement)
+
+
+class QueryDetectorMiddleware:
+    # Включается QUERY_DETECTOR_ENABLED. Считает формы SQL-запросов в каждом HTTP-запросе и сообщает
+    # о повторах больше порога; с QUERY_REPEAT_RAISE запрос падает с NPlusOneError (режим для тестов).
+    def __init__(self, app, threshold: int, raise_on_repeat: bool):
+        self.app = app
+        self.threshold = threshold
+        self.raise_on_repeat = raise_on_repeat
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        if _query_tracker.get() is not None:
+            # Запрос уже отслеживается снаружи (тест внутри inspect_queries) - считает внешний трекер
+            await self.app(scope, receive, send)
+            return
+
+        tracker = QueryTracker(self.threshold, self.raise_on_repeat, scope=scope)
+        token = _query_tracker.set(tracker)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _query_tracker.reset(token)
+            tracker.report()
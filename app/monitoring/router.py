@@ -0,0 +1,45 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.dao.routing import replica_pool
+from app.database import engine, pool_status
+from app.majors.cache import majors_cache
+from app.monitoring.metrics import metrics_registry, render_gauge
+from app.users.cache import users_cache
+
+router = APIRouter(tags=['Мониторинг'])
+
+PROMETHEUS_MEDIA_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+POOL_GAUGES = (
+    ('size', 'db_pool_size', 'Размер пула соединений', 'gauge'),
+    ('checked_out', 'db_pool_checked_out', 'Соединения, выданные из пула', 'gauge'),
+    ('idle', 'db_pool_idle', 'Свободные соединения в пуле', 'gauge'),
+    ('overflow', 'db_pool_overflow', 'Соединения сверх pool_size', 'gauge'),
+    ('waits', 'db_pool_waits_total', 'Число ожиданий соединения', 'counter'),
+    ('timeouts', 'db_pool_timeouts_total', 'Число таймаутов ожидания соединения', 'counter'),
+)
+CACHE_GAUGES = (
+    ('hits', 'cache_hits_total', 'Попадания в кэш', 'counter'),
+    ('misses', 'cache_misses_total', 'Промахи кэша', 'counter'),
+    ('hit_rate', 'cache_hit_ratio', 'Доля попаданий в кэш', 'gauge'),
+    ('size', 'cache_entries', 'Число записей в кэше', 'gauge'),
+)
+
+
+def collect_lines() -> list[str]:
+    pools = [({"role": "primary", "host": engine.url.host}, pool_status(engine))]
+    pools.extend(({"role": "replica", "host": replica.url.host}, pool_status(replica))
+                 for replica in replica_pool.engines)
+    caches = [({"cache": "users"}, users_cache.stats()), ({"cache": "majors"}, majors_cache.stats())]
+
+    lines = metrics_registry.render()
+    for key, name, documentation, kind in POOL_GAUGES:
+        lines.extend(render_gauge(name, documentation, [(labels, status[key]) for labels, status in pools], kind))
+    for key, name, documentation, kind in CACHE_GAUGES:
+        lines.extend(render_gauge(name, documentation, [(labels, stats[key]) for labels, stats in caches], kind))
+    return lines
+
+
+@router.get("/metrics", summary="Метрики в формате Prometheus", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse('\n'.join(collect_lines()) + '\n', media_type=PROMETHEUS_MEDIA_TYPE)
@@ -1,17 +1,51 @@
-import shutil
-from fastapi import APIRouter, Request, Depends, UploadFile
+from fastapi import APIRouter, Request, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 
-from app.students.router import get_all_students, get_student_by_id
+from app.assets.build import asset_url
+from app.dao.session import outside_request_session
+from app.students.dao import StudentDAO
+from app.students.photos import read_photo_upload, store_photo
+from app.students.rb import RequestBodyStudent, RequestPage
 from app.users.router import get_me
 
 router = APIRouter(prefix="/pages", tags=["Frontend"])
-templates = Jinja2Templates(directory="app/templates")
+# Окружение собирается один раз; скомпилированные шаблоны кэшируются на диске между перезапусками
+templates_env = Environment(loader=FileSystemLoader("app/templates"), autoescape=True,
+                            bytecode_cache=FileSystemBytecodeCache(), auto_reload=False)
+templates = Jinja2Templates(env=templates_env)
+templates.env.globals['asset_url'] = asset_url
+
+STREAM_CHUNK_SIZE = 8 * 1024
+
+
+async def _stream_template(name: str, **context):
+    # generate() отдает HTML по кусочкам; склеиваем их в порции, чтобы не слать сотни мелких чанков
+    buffer = []
+    buffered = 0
+    for chunk in templates.get_template(name).generate(**context):
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= STREAM_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        yield ''.join(buffer)
+
 
 @router.get("/students")
-async def get_students_html(request: Request, students=Depends(get_all_students)):
-    return templates.TemplateResponse(name="students.html",
-                                      context={"request": request, "students": students})
+async def get_students_html(request: Request, request_body: RequestBodyStudent = Depends(),
+                            page: RequestPage = Depends()):
+    students = await StudentDAO.find_page(after_id=page.after_id, limit=page.limit, **request_body.to_dict())
+    next_url = None
+    if students["next_cursor"]:
+        next_url = str(request.url.remove_query_params("after_id").include_query_params(cursor=students["next_cursor"]))
+    return StreamingResponse(_stream_template("students.html", request=request, students=students["items"],
+                                              next_url=next_url),
+                             media_type="text/html; charset=utf-8")
+
 @router.get("/register")
 async def get_register_html(request: Request):
     return templates.TemplateResponse(name="register.html",
@@ -29,12 +63,42 @@ async def get_profile_html(request: Request, profile=Depends(get_me)):
                                       context={'request': request, 'profile': profile})
 
 
-@router.post('/add_photo')
-async def add_student_photo(file: UploadFile, image_name: int):
-    with open(f"app/static/images/{image_name}.webp", "wb+") as photo_obj:
-        shutil.copyfileobj(file.file, photo_obj)
+PHOTO_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object", "required": ["file"],
+            "properties": {"file": {"type": "string", "format": "binary"}},
+        }}},
+    },
+}
+
+
+# Тело разбирает read_photo_upload с лимитом размера, схема для OpenAPI описана вручную
+@router.post('/add_photo', openapi_extra=PHOTO_UPLOAD_BODY)
+async def add_student_photo(request: Request, student_id: int) -> dict:
+    # Студента проверяем до записи файла, иначе на 404 в публичной папке остается ничей файл.
+    # Короткая сессия: соединение не должно удерживаться, пока загружается фото.
+    with outside_request_session():
+        student = await StudentDAO.find_by_id(student_id)
+    if student is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'Студент с id {student_id} не найден')
+
+    form, upload = await read_photo_upload(request)
+    try:
+        photo_name = await store_photo(upload)
+    finally:
+        await form.close()
+    check = await StudentDAO.update(filter_by={'id': student_id}, photo=photo_name)
+    if not check:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'Студент с id {student_id} не найден')
+    return {'message': 'Фото студента обновлено', 'photo': photo_name}
 
 @router.get('/students/{student_id}')
-async def get_students_html(request: Request, student=Depends(get_student_by_id)):
+async def get_students_html(request: Request, student_id: int):
+    # Не через обработчик API: тот проставляет ETag и может ответить 304 вместо данных
+    student = await StudentDAO.find_full_data_by_id(student_id)
+    if student is None:
+        student = {"message": f"Студент с id: {student_id} не был найден!"}
     return templates.TemplateResponse(name='student.html',
                                       context={'request': request, 'student': student})
\ No newline at end of file
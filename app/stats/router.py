@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Query
+from fastapi.params import Depends
+
+from app.stats.schemas import SchemaStudentStats, StudentStatsField
+from app.students.dao import StudentDAO
+from app.students.rb import RequestBodyStudent
+
+router = APIRouter(prefix='/stats', tags=['Статистика'])
+
+
+@router.get("/students", summary="Количество студентов по группам", response_model=SchemaStudentStats,
+            response_model_exclude_none=True)
+async def get_students_stats(group_by: list[StudentStatsField] = Query(['major_id']),
+                             request_body: RequestBodyStudent = Depends()):
+    # Например ?group_by=major_id&group_by=course - счетчики по каждой паре факультет + курс
+    fields = list(dict.fromkeys(group_by))
+    groups = await StudentDAO.count_by(fields, **request_body.to_dict())
+    return {"group_by": fields, "total": sum(group['count'] for group in groups), "groups": groups}
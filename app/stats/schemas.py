@@ -0,0 +1,18 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+StudentStatsField = Literal['major_id', 'course', 'enrollment_year']
+
+
+class SchemaStudentStatsGroup(BaseModel):
+    major_id: Optional[int] = Field(None, description="ID специальности")
+    major: Optional[str] = Field(None, description="Название факультета")
+    course: Optional[int] = Field(None, description="Курс")
+    enrollment_year: Optional[int] = Field(None, description="Год поступления")
+    count: int = Field(..., description="Кол-во студентов в группе")
+
+class SchemaStudentStats(BaseModel):
+    group_by: list[StudentStatsField] = Field(..., description="Поля группировки")
+    total: int = Field(..., description="Всего студентов по выбранным фильтрам")
+    groups: list[SchemaStudentStatsGroup] = Field(..., description="Группы с количеством студентов")
@@ -1,122 +1,297 @@
-from sqlalchemy import select, event, update, delete
+from collections import Counter
 
+from sqlalchemy import select, event, update, insert, inspect, func, literal_column, or_, case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.dao.pagination import encode_cursor
+from app.dao.session import get_session, get_transaction
 from app.database import async_session_maker
+from app.majors.cache import majors_cache
+from app.majors.counters import record_major_deltas, major_delta_rows
 from app.students.models import Student
-from app.majors.models import Major
+from app.majors.models import Major, MajorCountDelta
+from app.monitoring.queries import allow_repeated_queries
 from app.dao.base import BaseDAO
 
 
+
+# Должно в точности совпадать с выражением индекса ix_students_search_trgm, иначе индекс не используется
+_SPACE = literal_column("' '")
+SEARCH_DOCUMENT = func.lower(
+    Student.first_name + _SPACE + Student.last_name + _SPACE + Student.email + _SPACE + Student.phone_number
+)
+
+
+# Порядок колонок составных индексов: GROUP BY в том же порядке агрегируется прямо по индексу
+STATS_GROUP_ORDERS = tuple(tuple(column.name for column in index.columns) for index in Student.__table__.indexes)
+
+
+def _stats_group_order(fields) -> tuple[str, ...]:
+    for columns in STATS_GROUP_ORDERS:
+        if set(columns[:len(fields)]) == set(fields):
+            return columns[:len(fields)]
+    return tuple(fields)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+@event.listens_for(Session, 'after_flush')
+def collect_major_deltas(session, flush_context):
+    # Собираем изменения по факультетам за весь flush и пишем их одной вставкой в major_count_deltas
+    deltas = Counter()
+    for student in session.new:
+        if isinstance(student, Student):
+            deltas[student.major_id] += 1
+    for student in session.deleted:
+        if isinstance(student, Student):
+            deltas[student.major_id] -= 1
+    for student in session.dirty:
+        if isinstance(student, Student):
+            history = inspect(student).attrs.major_id.history
+            for old_major_id in history.deleted:
+                deltas[old_major_id] -= 1
+            for new_major_id in history.added:
+                deltas[new_major_id] += 1
+
+    rows = major_delta_rows(deltas)
+    if rows:
+        session.connection().execute(MajorCountDelta.__table__.insert(), rows)
+
+
 class StudentDAO(BaseDAO):
     model = Student
 
     @classmethod
     async def find_full_data(cls, **filter_by):
-        async with async_session_maker() as session:
-            # Первый запрос для получения информации о студенте
-            query_student = select(cls.model).filter_by(**filter_by)
-            result_student = await session.execute(query_student)
-            student_info = result_student.scalars().all()
-
-            result = []
+        async with get_session() as session:
+            result = await session.execute(cls._full_data_query(**filter_by))
+            students = result.scalars().all()
+        return await cls._with_majors(students)
 
-            for student in student_info:
-                # Второй запрос для получения информации о специальности
-                query_major = select(Major).filter_by(id=student.major_id)
-                result_major = await session.execute(query_major)
-                major_info = result_major.scalar_one()
-                student_data = student.to_dict()
-                student_data['major'] = major_info.major_name
-                result.append(student_data)
+    @classmethod
+    async def find_page(cls, after_id: int | None = None, limit: int = 100, **filter_by):
+        async with get_session() as session:
+            # Берем на одну запись больше, чтобы понять, есть ли следующая страница
+            query = cls._full_data_query(after_id=after_id, **filter_by).limit(limit + 1)
+            result = await session.execute(query)
+            students = result.scalars().all()
 
-            return result
+        items = await cls._with_majors(students[:limit])
+        next_cursor = encode_cursor(items[-1]['id']) if len(students) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
 
     @classmethod
-    async def find_full_data_by_id(cls, student_id: int):
+    async def stream_full_data(cls, after_id: int | None = None, **filter_by):
         async with async_session_maker() as session:
-            # Первый запрос для получения информации о студенте
-            query_student = select(cls.model).filter_by(id=student_id)
-            result_student = await session.execute(query_student)
-            student_info = result_student.scalar_one_or_none()
+            # Серверный курсор: строки приходят порциями, а не всей таблицей сразу.
+            # Отдельная сессия, потому что поток читается уже после завершения обработчика.
+            query = cls._full_data_query(after_id=after_id, **filter_by).execution_options(yield_per=500)
+            result = await session.stream(query)
+            async for students in result.scalars().partitions():
+                for student_data in await cls._with_majors(students):
+                    yield student_data
 
-            # Если студент не найден, возвращаем None
-            if not student_info:
-                return None
+    @classmethod
+    async def find_full_data_by_id(cls, student_id: int):
+        return await cls.find_one_or_none(id=student_id)
 
-            # Второй запрос для получения информации о специальности
-            query_major = select(Major).filter_by(id=student_info.major_id)
-            result_major = await session.execute(query_major)
-            major_info = result_major.scalar_one()
+    @classmethod
+    async def find_full_data_and_version(cls, student_id: int):
+        student = await cls.find_by_id(student_id)
+        if student is None:
+            return None
+        student_data, = await cls._with_majors([student])
+        return student_data, student.updated_at
 
-            student_data = student_info.to_dict()
-            student_data['major'] = major_info.major_name
+    @classmethod
+    async def find_full_data_by_ids(cls, student_ids: list[int]) -> dict[int, dict]:
+        # Один запрос с IN вместо запроса на каждого студента
+        async with get_session() as session:
+            result = await session.execute(select(cls.model).where(cls.model.id.in_(student_ids)))
+            students = result.scalars().all()
+        return {student['id']: student for student in await cls._with_majors(students)}
 
-            return student_data
+    @classmethod
+    async def find_version(cls, student_id: int):
+        # Только метаданные для проверки ETag, без загрузки строки целиком
+        async with get_session() as session:
+            query = select(cls.model.updated_at, cls.model.major_id).where(cls.model.id == student_id)
+            result = await session.execute(query)
+            version = result.one_or_none()
+        if version is None:
+            return None
+        names = await majors_cache.get_names({version.major_id})
+        return version.updated_at, names.get(version.major_id)
 
     @classmethod
-    async def find_one_or_none(cls,  **filter_by):
-        async with async_session_maker() as session:
-            # Первый запрос для получения информации о студенте
-            query_student = select(cls.model).filter_by(**filter_by)
-            result_student = await session.execute(query_student)
-            student_info = result_student.scalar_one_or_none()
+    async def find_one_or_none(cls, **filter_by):
+        async with get_session() as session:
+            query = select(cls.model).filter_by(**filter_by)
+            result = await session.execute(query)
+            student_info = result.scalar_one_or_none()
 
-            # Если студент не найден, возвращаем None
-            if not student_info:
-                return None
+        # Если студент не найден, возвращаем None
+        if not student_info:
+            return None
+
+        student_data, = await cls._with_majors([student_info])
+        return student_data
 
-            # Второй запрос для получения информации о специальности
-            query_major = select(Major).filter_by(id=student_info.major_id)
-            result_major = await session.execute(query_major)
-            major_info = result_major.scalar_one()
+    @classmethod
+    async def search(cls, q: str, limit: int = 20, offset: int = 0):
+        query = cls._search_query(q, limit + 1, offset)
+        async with get_session() as session:
+            result = await session.execute(query)
+            students = result.scalars().all()
+
+        items = await cls._with_majors(students[:limit])
+        next_offset = offset + limit if len(students) > limit else None
+        return {"items": items, "next_offset": next_offset}
 
-            student_data = student_info.to_dict()
-            student_data['major'] = major_info.major_name
+    @classmethod
+    async def count_by(cls, group_by, **filter_by) -> list[dict]:
+        columns = [getattr(cls.model, field) for field in _stats_group_order(group_by)]
+        query = (
+            select(*columns, func.count().label('count'))
+            .filter_by(**filter_by)
+            .group_by(*columns)
+            .order_by(*columns)
+        )
+        async with get_session() as session:
+            result = await session.execute(query)
+            groups = [dict(row) for row in result.mappings()]
 
-            return student_data
+        if 'major_id' in group_by:
+            names = await majors_cache.get_names({group['major_id'] for group in groups})
+            for group in groups:
+                group['major'] = names.get(group['major_id'])
+        return groups
 
-    @event.listens_for(Student, 'after_insert')
-    def receive_after_insert(mapper, connection, target):
-        major_id = target.major_id
-        connection.execute(
-            update(Major)
-            .where(Major.id == major_id)
-            .values(count_students=Major.count_students + 1)
+    @classmethod
+    def _search_query(cls, q: str, limit: int, offset: int):
+        term = q.strip().lower()
+        escaped = _escape_like(term)
+        # Ранг: нечеткое сходство со словами документа плюс бонус, если какое-то слово начинается с запроса
+        is_prefix = or_(SEARCH_DOCUMENT.like(f'{escaped}%', escape='\\'),
+                        SEARCH_DOCUMENT.like(f'% {escaped}%', escape='\\'))
+        rank = func.word_similarity(term, SEARCH_DOCUMENT) + case((is_prefix, 1.0), else_=0.0)
+        return (
+            select(cls.model)
+            # Оба условия обслуживает триграммный GIN-индекс
+            .where(or_(SEARCH_DOCUMENT.like(f'%{escaped}%', escape='\\'), SEARCH_DOCUMENT.op('%>')(term)))
+            .order_by(rank.desc(), cls.model.id)
+            .offset(offset)
+            .limit(limit)
         )
 
-    @event.listens_for(Student, 'after_delete')
-    def receive_after_delete(mapper, connection, target):
-        major_id = target.major_id
-        connection.execute(
-            update(Major)
-            .where(Major.id == major_id)
-            .values(count_students=Major.count_students - 1)
+    @classmethod
+    def _full_data_query(cls, after_id: int | None = None, **filter_by):
+        query = select(cls.model).filter_by(**filter_by)
+        if after_id is not None:
+            query = query.where(cls.model.id > after_id)
+        return query.order_by(cls.model.id)
+
+    @classmethod
+    def export_query(cls, **filter_by):
+        return (
+            select(*cls.model.__table__.columns, Major.major_name.label('major'))
+            .join(Major, Major.id == cls.model.major_id)
+            .where(*[getattr(cls.model, k) == v for k, v in filter_by.items()])
+            .order_by(cls.model.id)
         )
 
+    @staticmethod
+    async def _with_majors(students) -> list[dict]:
+        # Названия специальностей берем из справочника в памяти, без запроса к БД
+        names = await majors_cache.get_names({student.major_id for student in students})
+        result = []
+        for student in students:
+            student_data = student.to_dict()
+            student_data['major'] = names.get(student.major_id)
+            result.append(student_data)
+        return result
+
+    @classmethod
+    async def update(cls, filter_by, **values):
+        if 'major_id' not in values:
+            return await super().update(filter_by, **values)
+
+        async with get_transaction() as session:
+            where = [getattr(cls.model, k) == v for k, v in filter_by.items()]
+            # Смена специальности: блокируем строки и запоминаем старые major_id до UPDATE
+            old_majors = await session.execute(select(cls.model.major_id).where(*where).with_for_update())
+            deltas = Counter()
+            for old_major_id in old_majors.scalars():
+                deltas[old_major_id] -= 1
+                deltas[values['major_id']] += 1
+
+            query = (
+                update(cls.model)
+                .where(*where)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            result = await session.execute(query)
+            await record_major_deltas(session, deltas)
+            return result.rowcount
+
     @classmethod
     async def add_student(cls, **student_data: dict):
-        async with async_session_maker() as session:
-            async with session.begin():
-                new_student = Student(**student_data)
-                session.add(new_student)
-                await session.flush()
-                new_student_id = new_student.id
-                await session.commit()
-                return new_student_id
+        async with get_transaction() as session:
+            new_student = Student(**student_data)
+            session.add(new_student)
+            await session.flush()
+            return new_student.id
 
     @classmethod
     async def delete_student_by_id(cls, student_id: int):
-        async with async_session_maker() as session:
-            async with session.begin():
-                query = select(cls.model).filter_by(id=student_id)
-                result = await session.execute(query)
-                student_to_delete = result.scalar_one_or_none()
+        async with get_transaction() as session:
+            # Блокировка строки: параллельное удаление того же студента дождется нас и не найдет его,
+            # а не спишет студента со счетчика факультета второй раз. FOR UPDATE идет на основной сервер.
+            query = select(cls.model).filter_by(id=student_id).with_for_update()
+            result = await session.execute(query)
+            student_to_delete = result.scalar_one_or_none()
+
+            if not student_to_delete:
+                return None
+
+            # Удаляем через сессию, чтобы изменение попало в счетчик факультета при flush
+            await session.delete(student_to_delete)
+            return student_id
+
+    @classmethod
+    async def add_students_bulk(cls, students: list[tuple[int, dict]], batch_size: int):
+        # students - пары (номер строки во входных данных, данные студента)
+        errors = []
+        added_per_major = Counter()
+        async with get_transaction() as session:
+            # Одинаковые INSERT по пачкам - намеренный повтор, а не N+1
+            with allow_repeated_queries():
+                for start in range(0, len(students), batch_size):
+                    batch = students[start:start + batch_size]
+                    try:
+                        # Многострочный INSERT на всю пачку в отдельной точке сохранения
+                        async with session.begin_nested():
+                            await session.execute(insert(cls.model), [data for _, data in batch])
+                        added = batch
+                    except IntegrityError:
+                        # В пачке есть конфликтная строка - вставляем по одной, чтобы найти виновных
+                        added = []
+                        for row, data in batch:
+                            try:
+                                async with session.begin_nested():
+                                    await session.execute(insert(cls.model), [data])
+                                added.append((row, data))
+                            except IntegrityError as e:
+                                errors.append({"row": row, "errors": [str(e.orig)]})
 
-                if not student_to_delete:
-                    return None
+                    for _, data in added:
+                        added_per_major[data['major_id']] += 1
 
-                await session.execute(
-                    delete(cls.model).filter_by(id=student_id)
-                )
+            # Bulk INSERT идет мимо flush, поэтому дельты записываем сами: одна строка на факультет
+            await record_major_deltas(session, added_per_major)
 
-                await session.commit()
-                return student_id
\ No newline at end of file
+        return sum(added_per_major.values()), errors
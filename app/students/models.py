@@ -1,10 +1,18 @@
-from sqlalchemy import ForeignKey, Text
+from sqlalchemy import ForeignKey, Index, Text
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base, str_uniq, int_pk, str_null_true
 from datetime import date
 
 # создаем модель таблицы студентов
 class Student(Base):
+    # Индексы под фильтры RequestBodyStudent: любая комбинация course/major_id/enrollment_year
+    # покрывается префиксом одного из них, первый заодно индексирует внешний ключ major_id
+    __table_args__ = (
+        Index('ix_students_major_id_course_enrollment_year', 'major_id', 'course', 'enrollment_year'),
+        Index('ix_students_course_enrollment_year', 'course', 'enrollment_year'),
+        Index('ix_students_enrollment_year_major_id', 'enrollment_year', 'major_id'),
+    )
+
     id: Mapped[int_pk]
     phone_number: Mapped[str_uniq]
     first_name: Mapped[str]
@@ -38,5 +46,6 @@ class Student(Base):
             "enrollment_year": self.enrollment_year,
             "course": self.course,
             "special_notes": self.special_notes,
-            "major_id": self.major_id
+            "major_id": self.major_id,
+            "photo": self.photo
         }
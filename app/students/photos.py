@@ -0,0 +1,88 @@
+import hashlib
+import os
+import uuid
+
+import anyio
+from fastapi import HTTPException, Request, UploadFile, status
+
+from app.config import settings
+
+PHOTOS_DIR = 'app/static/images'
+# Незавершенные загрузки - вне публичной /static, но на той же файловой системе, чтобы os.replace был атомарным
+UPLOADS_TMP_DIR = 'app/uploads_tmp'
+CHUNK_SIZE = 64 * 1024
+# Запас на границы и заголовки частей multipart сверх самого файла
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                         detail=f'Фото больше {settings.PHOTO_MAX_SIZE} байт')
+
+
+def _limited_receive(receive, limit: int):
+    received = 0
+
+    async def receive_with_limit():
+        nonlocal received
+        message = await receive()
+        if message['type'] == 'http.request':
+            received += len(message.get('body', b''))
+            if received > limit:
+                raise _too_large()
+        return message
+
+    return receive_with_limit
+
+
+async def read_photo_upload(request: Request):
+    # Разбираем multipart сами и с ограничением: парсер Starlette иначе целиком сложит
+    # сколь угодно большой файл во временный файл, прежде чем мы увидим его размер
+    limit = settings.PHOTO_MAX_SIZE + MULTIPART_OVERHEAD
+    try:
+        content_length = int(request.headers.get('content-length', 0))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Некорректный Content-Length')
+    if content_length > limit:
+        raise _too_large()
+
+    # Без Content-Length (chunked) лимит держит счетчик байтов в receive
+    limited = Request(request.scope, receive=_limited_receive(request.receive, limit))
+    form = await limited.form(max_files=1, max_fields=10)
+    upload = form.get('file')
+    if upload is None or isinstance(upload, str):
+        await form.close()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Не передан файл в поле file')
+    return form, upload
+
+
+async def store_photo(upload: UploadFile) -> str:
+    # Пишем загрузку порциями во временный файл, попутно считая sha256 и размер.
+    # Имя итогового файла - хэш содержимого, поэтому одинаковые фото хранятся один раз.
+    digest = hashlib.sha256()
+    size = 0
+    await anyio.Path(UPLOADS_TMP_DIR).mkdir(parents=True, exist_ok=True)
+    tmp_path = os.path.join(UPLOADS_TMP_DIR, f'upload-{uuid.uuid4().hex}')
+    try:
+        async with await anyio.open_file(tmp_path, 'wb') as tmp_file:
+            while chunk := await upload.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.PHOTO_MAX_SIZE:
+                    raise _too_large()
+                digest.update(chunk)
+                await tmp_file.write(chunk)
+
+        if size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Пустой файл')
+
+        photo_name = f'{digest.hexdigest()}.webp'
+        photo_path = os.path.join(PHOTOS_DIR, photo_name)
+        if await anyio.Path(photo_path).exists():
+            await anyio.Path(tmp_path).unlink()
+        else:
+            # Переименование атомарно: читатели видят либо старое состояние, либо файл целиком
+            os.replace(tmp_path, photo_path)
+        return photo_name
+    except BaseException:
+        await anyio.Path(tmp_path).unlink(missing_ok=True)
+        raise
@@ -1,3 +1,8 @@
+from fastapi import HTTPException, Query, status
+
+from app.dao.pagination import decode_cursor
+
+
 class RequestBodyStudent:
     def __init__(self, student_id: int | None = None,
                  course: int | None = None,
@@ -12,4 +17,17 @@ class RequestBodyStudent:
         data = {'id': self.id, 'course': self.course, 'major_id': self.major_id,
                 'enrollment_year': self.enrollment_year}
         filtered_data = {key: value for key, value in data.items() if value is not None}
-        return filtered_data
\ No newline at end of file
+        return filtered_data
+
+
+class RequestPage:
+    def __init__(self, after_id: int | None = None,
+                 cursor: str | None = None,
+                 limit: int = Query(100, ge=1, le=1000)):
+        if cursor is not None:
+            try:
+                after_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        self.after_id = after_id
+        self.limit = limit
@@ -1,15 +1,73 @@
-from fastapi import APIRouter
+import csv
+import io
+
+import orjson
+from fastapi import APIRouter, Request, Response, HTTPException, Query, status
 from fastapi.params import Depends
+from fastapi.responses import StreamingResponse, ORJSONResponse
+
+from pydantic import ValidationError
 
+from app.config import settings
+from app.dao.export import iter_csv
+from app.http_cache import etag_matches, not_modified, weak_etag
 from app.students.dao import StudentDAO
-from app.students.rb import RequestBodyStudent
-from app.students.schemas import SchemaStudent, SchemaStudentAdd, SchemaStudentUpdate
+from app.students.rb import RequestBodyStudent, RequestPage
+from app.students.schemas import (SchemaStudent, SchemaStudentAdd, SchemaStudentUpdate, SchemaStudentPage,
+                                  SchemaStudentSearchPage, SchemaStudentBatch)
 
 router = APIRouter(prefix='/students', tags=['Работа со студентами'])
 
-@router.get("/", summary="Получить всех студентов")
-async def get_all_students(request_body: RequestBodyStudent = Depends()) -> list[SchemaStudent]:
-    return await StudentDAO.find_full_data(**request_body.to_dict())
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+async def _read_bulk_rows(request: Request) -> list[dict]:
+    content_type = request.headers.get('content-type', '')
+    if content_type.startswith('application/json'):
+        try:
+            rows = await request.json()
+        except ValueError:
+            rows = None
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Ожидается JSON-массив студентов')
+        return rows
+
+    if content_type.startswith('multipart/form-data'):
+        form = await request.form()
+        upload = form.get('file')
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Не передан CSV-файл в поле file')
+        content = await upload.read()
+    elif content_type.startswith('text/csv'):
+        content = await request.body()
+    else:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail='Поддерживаются application/json, text/csv и multipart/form-data')
+
+    try:
+        reader = csv.DictReader(io.StringIO(content.decode('utf-8-sig')))
+        # Пустые ячейки CSV считаем отсутствующими значениями
+        return [{key: value or None for key, value in row.items()} for row in reader]
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f'Некорректный CSV: {e}')
+
+
+async def _ndjson_lines(rows):
+    async for row in rows:
+        yield orjson.dumps(row) + b'\n'
+
+
+@router.get("/", summary="Получить всех студентов", response_model=SchemaStudentPage)
+async def get_all_students(request: Request, request_body: RequestBodyStudent = Depends(),
+                           page: RequestPage = Depends()):
+    # Accept: application/x-ndjson - отдаем строки потоком по мере чтения из БД, без пагинации
+    if NDJSON_MEDIA_TYPE in request.headers.get('accept', ''):
+        rows = StudentDAO.stream_full_data(after_id=page.after_id, **request_body.to_dict())
+        return StreamingResponse(_ndjson_lines(rows), media_type=NDJSON_MEDIA_TYPE)
+    result = await StudentDAO.find_page(after_id=page.after_id, limit=page.limit, **request_body.to_dict())
+    # Данные из нашей же БД уже прошли SchemaStudentAdd при записи: сериализуем без повторной
+    # валидации. response_model остается только для документации OpenAPI.
+    return ORJSONResponse(result)
 
 @router.get("/by_filter", summary="Получить студента по фильтру")
 async def get_student_by_filter(request_body: RequestBodyStudent = Depends()) -> SchemaStudent | dict:
@@ -18,12 +76,50 @@ async def get_student_by_filter(request_body: RequestBodyStudent = Depends()) ->
         return {"message" : "Студент с указанными параметрами был не найден!"}
     return result
 
+@router.get("/export.csv", summary="Выгрузить студентов в CSV")
+async def export_students_csv(request_body: RequestBodyStudent = Depends()):
+    query = StudentDAO.export_query(**request_body.to_dict())
+    return StreamingResponse(iter_csv(query, StudentDAO.stream_rows(query)), media_type='text/csv',
+                             headers={'Content-Disposition': 'attachment; filename="students.csv"'})
+
+@router.get("/search", summary="Поиск студентов по имени, фамилии, email и телефону",
+            response_model=SchemaStudentSearchPage)
+async def search_students(q: str = Query(..., min_length=2, max_length=100),
+                          limit: int = Query(20, ge=1, le=100),
+                          offset: int = Query(0, ge=0, le=10000)):
+    # Из пробелов получился бы LIKE '%%' - полный перебор таблицы
+    if len(q.strip()) < 2:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail='Поисковый запрос должен содержать не меньше 2 символов, кроме пробелов')
+    return ORJSONResponse(await StudentDAO.search(q, limit=limit, offset=offset))
+
+@router.get("/batch", summary="Получить студентов по списку id", response_model=SchemaStudentBatch)
+async def get_students_batch(ids: list[int] = Query(..., min_length=1, max_length=settings.STUDENTS_BATCH_MAX_IDS,
+                                                    description="id студентов: ?ids=1&ids=2")):
+    ids = list(dict.fromkeys(ids))
+    found = await StudentDAO.find_full_data_by_ids(ids)
+    return ORJSONResponse({
+        "items": [found[student_id] for student_id in ids if student_id in found],
+        "missing": [student_id for student_id in ids if student_id not in found],
+    })
+
 @router.get("/{student_id}", summary="Получить студента по id")
-async def get_student_by_id(student_id: int) -> SchemaStudent | dict:
-    result = await StudentDAO.find_full_data_by_id(student_id)
+async def get_student_by_id(student_id: int, request: Request, response: Response) -> SchemaStudent | dict:
+    # Название факультета входит в ответ, поэтому и в ETag: переименование факультета меняет тег
+    if request.headers.get('if-none-match'):
+        version = await StudentDAO.find_version(student_id)
+        if version is not None:
+            etag = weak_etag(student_id, *version)
+            if etag_matches(request, etag):
+                return not_modified(etag, 'no-cache')
+
+    result = await StudentDAO.find_full_data_and_version(student_id)
     if result is None:
         return {"message" : f"Студент с id: {student_id} не был найден!"}
-    return result
+    student, updated_at = result
+    response.headers['ETag'] = weak_etag(student_id, updated_at, student['major'])
+    response.headers['Cache-Control'] = 'no-cache'
+    return student
 
 @router.post("/add/", summary="Добавить нового студента")
 async def add_student(student: SchemaStudentAdd) -> dict:
@@ -33,6 +129,27 @@ async def add_student(student: SchemaStudentAdd) -> dict:
     else:
         return {"message": "Ошибка при добавлении студента!"}
 
+@router.post("/bulk", summary="Массовое добавление студентов (JSON-массив или CSV)")
+async def add_students_bulk(request: Request,
+                            batch_size: int | None = Query(None, ge=1, le=10000)) -> dict:
+    rows = await _read_bulk_rows(request)
+
+    # Валидируем все строки за один проход и собираем ошибки, не прерываясь на первой
+    students = []
+    errors = []
+    for row_number, row in enumerate(rows, start=1):
+        try:
+            students.append((row_number, SchemaStudentAdd.model_validate(row).model_dump()))
+        except ValidationError as e:
+            errors.append({"row": row_number, "errors": e.errors(include_url=False, include_context=False)})
+
+    added, db_errors = await StudentDAO.add_students_bulk(
+        students, batch_size=batch_size or settings.BULK_INSERT_BATCH_SIZE
+    )
+    errors.extend(db_errors)
+    errors.sort(key=lambda error: error["row"])
+    return {"message": f"Добавлено студентов: {added} из {len(rows)}", "added": added, "errors": errors}
+
 @router.delete("/del/{student_id}", summary="Удалить студента по id")
 async def del_student_by_id(student_id: int) -> dict:
     check = await StudentDAO.delete_student_by_id(student_id=student_id)
@@ -33,6 +33,18 @@ class SchemaStudent(BaseModel):
             raise ValueError('Дата рождения должна быть в прошлом')
         return value
 
+class SchemaStudentPage(BaseModel):
+    items: list[SchemaStudent] = Field(..., description="Студенты на текущей странице")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы, None если это последняя страница")
+
+class SchemaStudentSearchPage(BaseModel):
+    items: list[SchemaStudent] = Field(..., description="Найденные студенты, самые релевантные первыми")
+    next_offset: Optional[int] = Field(None, description="Смещение следующей страницы, None если это последняя страница")
+
+class SchemaStudentBatch(BaseModel):
+    items: list[SchemaStudent] = Field(..., description="Найденные студенты в порядке запрошенных id")
+    missing: list[int] = Field(..., description="Запрошенные id, которых нет в базе")
+
 class SchemaStudentAdd(BaseModel):
     phone_number: str = Field(..., description="Номер телефона в международном формате, начинающийся с '+'")
     first_name: str = Field(..., min_length=1, max_length=50, description="Имя студента, от 1 до 50 символов")
@@ -1,21 +1,49 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta, timezone
 
 from pydantic import EmailStr
 
-from app.config import get_auth_data
+from app.config import get_auth_data, settings
+from app.dao.session import outside_request_session
 from app.users.dao import UsersDAO
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+class HashingPool:
+    # bcrypt считает ~200 мс и отпускает GIL, поэтому выносим его в отдельный пул потоков.
+    # Очередь ограничена: при перегрузке сразу отвечаем 503, а не копим ожидающие логины.
+    def __init__(self, workers: int, queue_size: int):
+        self.limit = workers + queue_size
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+    async def run(self, func, *args):
+        if self.pending >= self.limit:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail='Сервис авторизации перегружен, попробуйте позже',
+                                headers={'Retry-After': '1'})
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+
+
+hashing_pool = HashingPool(workers=settings.PASSWORD_HASH_WORKERS, queue_size=settings.PASSWORD_HASH_QUEUE_SIZE)
+
+
+async def get_password_hash(password: str) -> str:
+    return await hashing_pool.run(pwd_context.hash, password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_pool.run(pwd_context.verify, plain_password, hashed_password)
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
@@ -26,7 +54,10 @@ def create_access_token(data: dict) -> str:
     return encode_jwt
 
 async def authenticate_user(email: EmailStr, password: str):
-    user = await UsersDAO.find_one_or_none(email=email)
-    if not user or verify_password(plain_password=password, hashed_password=user.password) is False:
+    # Соединение отдаем в пул до проверки пароля: иначе шквал логинов выберет весь пул,
+    # пока ждет своей очереди на bcrypt
+    with outside_request_session():
+        user = await UsersDAO.find_one_or_none(email=email)
+    if not user or await verify_password(plain_password=password, hashed_password=user.password) is False:
         return None
     return user
\ No newline at end of file
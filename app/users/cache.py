@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+
+from app.config import settings
+from app.users.schemas import SchemaUser
+
+
+class UsersCache:
+    # Ограниченный LRU-кэш пользователей по id с временем жизни записи
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._users: OrderedDict[int, tuple[float, SchemaUser]] = OrderedDict()
+        # Растет при каждом сбросе: снимок, прочитанный до сброса, в кэш не попадет
+        self.generation = 0
+
+    def get(self, user_id: int) -> SchemaUser | None:
+        item = self._users.get(user_id)
+        if item is None or item[0] < time.monotonic():
+            self._users.pop(user_id, None)
+            self.misses += 1
+            return None
+        self._users.move_to_end(user_id)
+        self.hits += 1
+        return item[1]
+
+    def put(self, user: SchemaUser, generation: int):
+        if generation != self.generation:
+            return
+        self._users[user.id] = (time.monotonic() + self.ttl, user)
+        self._users.move_to_end(user.id)
+        while len(self._users) > self.maxsize:
+            self._users.popitem(last=False)
+
+    def invalidate(self, user_id: int | None = None):
+        self.generation += 1
+        if user_id is None:
+            self._users.clear()
+        else:
+            self._users.pop(user_id, None)
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._users),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / requests, 4) if requests else 0.0,
+        }
+
+
+users_cache = UsersCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
@@ -1,6 +1,28 @@
 from app.dao.base import BaseDAO
+from app.dao.session import call_after_commit
+from app.users.cache import users_cache
 from app.users.models import User
 
 
 class UsersDAO(BaseDAO):
-    model = User
\ No newline at end of file
+    model = User
+
+    @classmethod
+    async def update(cls, filter_by, **values):
+        result = await super().update(filter_by, **values)
+        call_after_commit(lambda: cls._invalidate_cache(filter_by))
+        return result
+
+    @classmethod
+    async def delete(cls, delete_all: bool = False, **filter_by):
+        result = await super().delete(delete_all, **filter_by)
+        call_after_commit(lambda: cls._invalidate_cache(filter_by))
+        return result
+
+    @staticmethod
+    def _invalidate_cache(filter_by: dict):
+        # Если изменение адресовано не по id, не знаем, кого именно задело - сбрасываем весь кэш
+        if set(filter_by) == {'id'}:
+            users_cache.invalidate(filter_by['id'])
+        else:
+            users_cache.invalidate()
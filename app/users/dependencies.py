@@ -2,8 +2,10 @@ from fastapi import Request, HTTPException, status, Depends
 from jose import jwt, JWTError
 from datetime import datetime, timezone
 from app.config import get_auth_data
+from app.dao.session import call_after_commit
+from app.users.cache import users_cache
 from app.users.dao import UsersDAO
-from app.users.models import User
+from app.users.schemas import SchemaUser
 
 
 def get_token(request: Request):
@@ -28,13 +30,19 @@ async def get_current_user(token: str = Depends(get_token)):
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Не найден ID пользователя')
 
-    user = await UsersDAO.find_by_id(int(user_id))
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Пользователь не найден')
+    user = users_cache.get(int(user_id))
+    if user is None:
+        generation = users_cache.generation
+        user_row = await UsersDAO.find_by_id(int(user_id))
+        if not user_row:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Пользователь не найден')
+        # Кэшируем снимок, а не объект сессии: при откате запроса тот истекает и отсоединяется
+        user = SchemaUser.model_validate(user_row)
+        call_after_commit(lambda: users_cache.put(user, generation))
 
     return user
 
-async def get_current_admin_user(current_user: User = Depends(get_current_user)):
+async def get_current_admin_user(current_user: SchemaUser = Depends(get_current_user)):
     if current_user.is_admin:
         return current_user
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Недостаточно прав!')
\ No newline at end of file
@@ -1,16 +1,16 @@
 from fastapi import APIRouter, HTTPException, status, Response, Depends
 
+from app.dao.session import outside_request_session
 from app.users.auth import get_password_hash, authenticate_user, create_access_token
 from app.users.dao import UsersDAO
 from app.users.dependencies import get_current_user, get_current_admin_user
-from app.users.models import User
-from app.users.schemas import SchemaUserRegister, SchemaUserAuth
+from app.users.schemas import SchemaUser, SchemaUserRegister, SchemaUserAuth
 
 router = APIRouter(prefix='/auth', tags=['Auth'])
 
 
 @router.get("/me/")
-async def get_me(user_data: User = Depends(get_current_user)):
+async def get_me(user_data: SchemaUser = Depends(get_current_user)):
     return user_data
 
 
@@ -21,20 +21,22 @@ async def logout_user(response: Response):
 
 
 @router.get("/all_users/")
-async def get_all_users(user_data: User = Depends(get_current_admin_user)):
+async def get_all_users(user_data: SchemaUser = Depends(get_current_admin_user)):
     return await UsersDAO.find_all()
 
 
 @router.post("/register/", summary="Регистрация нового пользователя")
 async def register_user(user_data: SchemaUserRegister) -> dict:
-    user = await UsersDAO.find_one_or_none(email=user_data.email)
+    # Проверка на короткой сессии: транзакция запроса начнется только с вставки, уже после хэширования
+    with outside_request_session():
+        user = await UsersDAO.find_one_or_none(email=user_data.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail='Пользователь уже существует'
         )
     user_dict = user_data.dict()
-    user_dict['password'] = get_password_hash(user_data.password)
+    user_dict['password'] = await get_password_hash(user_data.password)
     await UsersDAO.add(**user_dict)
     return {'message': 'Вы успешно зарегистрированы!'}
 
@@ -1,7 +1,21 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 import re
 
 
+class SchemaUser(BaseModel):
+    # Неизменяемый снимок пользователя для кэша и зависимостей, без хэша пароля
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    id: int
+    phone_number: str
+    first_name: str
+    last_name: str
+    email: str
+    is_user: bool
+    is_student: bool
+    is_teacher: bool
+    is_admin: bool
+    is_super_admin: bool
+
 class SchemaUserRegister(BaseModel):
     email: EmailStr = Field(..., description="Электронная почта")
     password: str = Field(..., min_length=5, max_length=50, description="Пароль, от 5 до 50 знаков")
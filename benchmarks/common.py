@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import time
+from datetime import datetime, timezone
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    # Ближайший ранг: без интерполяции, как в большинстве нагрузочных инструментов
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: list[float], elapsed: float, **extra) -> dict:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        **extra,
+    }
+
+
+async def measure(operation, iterations: int, concurrency: int = 1) -> dict:
+    # operation(i) - корутина одной операции; concurrency воркеров разбирают общий счетчик итераций
+    latencies = []
+    counter = iter(range(iterations))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            await operation(i)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, concurrency=concurrency)
+
+
+def git_sha() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def save_results(name: str, params: dict, results: dict, tag: str | None = None) -> str:
+    # tag различает прогоны одного коммита (например, A/B с разными переменными окружения)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    sha = git_sha()
+    filename = f'{name}-{sha}-{tag}.json' if tag else f'{name}-{sha}.json'
+    path = os.path.join(RESULTS_DIR, filename)
+    payload = {
+        "name": name,
+        "git_sha": sha,
+        "tag": tag,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "params": params,
+        "results": results,
+    }
+    with open(path, 'w', encoding='utf-8') as results_file:
+        json.dump(payload, results_file, ensure_ascii=False, indent=2)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    print(f'Результаты сохранены в {path}')
+    return path
+
+
+def check_p95_budgets(results: dict, budgets: dict[str, float]) -> bool:
+    # budgets: сценарий -> допустимый p95 в мс; сценарии, которые не запускались, пропускаются
+    within = True
+    for name, budget in budgets.items():
+        if name not in results:
+            continue
+        p95 = results[name]['p95_ms']
+        if p95 > budget:
+            within = False
+            print(f'ПРЕВЫШЕН БЮДЖЕТ {name}: p95 {p95} мс > {budget} мс')
+        else:
+            print(f'{name}: p95 {p95} мс в пределах бюджета {budget} мс')
+    return within
+
+
+def add_tag_argument(parser: argparse.ArgumentParser):
+    parser.add_argument('--tag', type=tag_name,
+                        help='Метка прогона в имени файла результатов: <имя>-<git sha>-<метка>.json')
+
+
+def tag_name(value: str) -> str:
+    if not re.fullmatch(r'[A-Za-z0-9_.-]+', value):
+        raise argparse.ArgumentTypeError('метка может содержать только латиницу, цифры, "_", "." и "-"')
+    return value
+
+
+def base_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=10)
+    add_tag_argument(parser)
+    return parser
@@ -0,0 +1,58 @@
+"""Сравнение двух файлов результатов (например, до и после коммита).
+
+    python -m benchmarks.compare benchmarks/results/http-abc1234.json benchmarks/results/http-def5678.json
+"""
+import argparse
+import json
+import sys
+
+# Для латентности рост - регрессия, для пропускной способности - падение
+METRICS = {"p50_ms": 1, "p95_ms": 1, "p99_ms": 1, "throughput_rps": -1, "bytes": 1}
+
+
+def flatten(results: dict, prefix: str = '') -> dict:
+    # Сценарии бывают вложенными (compression.gzip, login_burst.probe_baseline)
+    flat = {}
+    for name, value in results.items():
+        if not isinstance(value, dict):
+            continue
+        key = f'{prefix}{name}'
+        if any(metric in value for metric in METRICS):
+            flat[key] = value
+        else:
+            flat.update(flatten(value, f'{key}.'))
+    return flat
+
+
+def load(path: str) -> dict:
+    with open(path, encoding='utf-8') as results_file:
+        return json.load(results_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сравнение результатов бенчмарков')
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Допустимое ухудшение, %%')
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    before, after = flatten(baseline['results']), flatten(candidate['results'])
+    print(f'{baseline["git_sha"]} -> {candidate["git_sha"]}')
+
+    regressions = 0
+    for scenario in sorted(before.keys() & after.keys()):
+        for metric, direction in METRICS.items():
+            old, new = before[scenario].get(metric), after[scenario].get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            regressed = change * direction > args.threshold
+            regressions += regressed
+            marker = '  <-- регрессия' if regressed else ''
+            print(f'{scenario:40} {metric:15} {old:>12} {new:>12} {change:+8.1f}%{marker}')
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
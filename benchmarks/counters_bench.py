@@ -0,0 +1,61 @@
+"""Конкурентные вставки студентов в один факультет: счетчик через дельты против UPDATE на каждую строку.
+
+    python -m benchmarks.counters_bench --iterations 2000 --concurrency 50
+"""
+import asyncio
+
+from sqlalchemy import insert, text, update
+
+from app.database import async_session_maker, engine
+from app.majors.models import Major
+from app.students.dao import StudentDAO
+from app.students.models import Student
+from benchmarks.common import base_parser, measure, save_results
+from benchmarks.seed import generate_students, recount_majors, STUDENT_COLUMNS
+
+BENCH_OFFSET = 2 * 10 ** 8
+
+
+async def add_with_direct_update(data: dict):
+    # Поведение до перехода на дельты: каждая вставка обновляет строку факультета в своей транзакции
+    async with async_session_maker() as session:
+        async with session.begin():
+            await session.execute(insert(Student).values(**data))
+            await session.execute(
+                update(Major).where(Major.id == data['major_id']).values(count_students=Major.count_students + 1)
+            )
+
+
+async def run(iterations: int, concurrency: int, tag: str | None = None):
+    async with engine.connect() as connection:
+        major_id = (await connection.execute(text('SELECT min(id) FROM majors'))).scalar_one()
+    if major_id is None:
+        raise SystemExit('Нет факультетов - сначала запустите python -m benchmarks.seed')
+
+    results = {}
+    for mode, offset in (('direct_update', BENCH_OFFSET), ('deltas', BENCH_OFFSET + iterations)):
+        rows = []
+        for row in generate_students(iterations, [major_id], start=offset):
+            data = dict(zip(STUDENT_COLUMNS, row))
+            data.pop('created_at')
+            data.pop('updated_at')
+            rows.append(data)
+        if mode == 'direct_update':
+            results[mode] = await measure(lambda i: add_with_direct_update(rows[i]), iterations, concurrency)
+        else:
+            results[mode] = await measure(lambda i: StudentDAO.add_student(**rows[i]), iterations, concurrency)
+
+    async with engine.begin() as connection:
+        await connection.execute(text("DELETE FROM students WHERE phone_number LIKE '+792%'"))
+        await recount_majors(connection)
+    await engine.dispose()
+    save_results('counters', {"iterations": iterations, "concurrency": concurrency}, results, tag)
+
+
+def main():
+    args = base_parser('Конкурентные вставки в один факультет').parse_args()
+    asyncio.run(run(args.iterations, args.concurrency, args.tag))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Микробенчмарки DAO на заполненной БД (см. benchmarks/seed.py).
+
+    python -m benchmarks.dao_bench --iterations 500 --concurrency 20
+"""
+import asyncio
+import random
+import sys
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.students.dao import StudentDAO
+from benchmarks.common import base_parser, check_p95_budgets, measure, save_results
+from benchmarks.seed import generate_students, STUDENT_COLUMNS
+
+
+async def run(iterations: int, concurrency: int, search_p95_ms: float, tag: str | None = None) -> bool:
+    rng = random.Random(7)
+    async with engine.begin() as connection:
+        # Остатки прерванного прогона заняли бы номера телефонов ниже
+        await connection.execute(text("DELETE FROM students WHERE phone_number LIKE '+791%'"))
+        max_id = (await connection.execute(text('SELECT max(id) FROM students'))).scalar_one()
+        major_ids = list((await connection.execute(text('SELECT id FROM majors'))).scalars())
+    if not max_id:
+        raise SystemExit('Таблица students пуста - сначала запустите python -m benchmarks.seed')
+
+    results = {
+        "find_full_data": await measure(
+            lambda i: StudentDAO.find_full_data(major_id=rng.choice(major_ids), course=rng.randint(1, 5),
+                                                enrollment_year=rng.randint(2002, 2025)),
+            iterations, concurrency),
+        "find_page": await measure(
+            lambda i: StudentDAO.find_page(after_id=rng.randint(0, max_id), limit=100, major_id=rng.choice(major_ids)),
+            iterations, concurrency),
+        "find_one_or_none": await measure(
+            lambda i: StudentDAO.find_one_or_none(id=rng.randint(1, max_id)), iterations, concurrency),
+        "update": await measure(
+            lambda i: StudentDAO.update(filter_by={'id': rng.randint(1, max_id)}, course=rng.randint(1, 5)),
+            iterations, concurrency),
+        "update_major": await measure(
+            lambda i: StudentDAO.update(filter_by={'id': rng.randint(1, max_id)}, major_id=rng.choice(major_ids)),
+            iterations, concurrency),
+        "search": await measure(
+            lambda i: StudentDAO.search(rng.choice(('ива', 'петр', 'student12', '+79000001', 'смирн'))),
+            iterations, concurrency),
+    }
+
+    # Удаляем только студентов, созданных здесь же, чтобы не портить данные для следующих прогонов
+    new_ids = []
+    for row in generate_students(iterations, major_ids, start=10 ** 8):
+        data = dict(zip(STUDENT_COLUMNS, row))
+        data.pop('created_at')
+        data.pop('updated_at')
+        new_ids.append(await StudentDAO.add_student(**data))
+    results["delete_student_by_id"] = await measure(
+        lambda i: StudentDAO.delete_student_by_id(new_ids[i]), iterations, concurrency)
+
+    await engine.dispose()
+    save_results('dao', {"iterations": iterations, "concurrency": concurrency, "students": max_id}, results, tag)
+    return check_p95_budgets(results, {"search": search_p95_ms})
+
+
+def main():
+    parser = base_parser('Микробенчмарки DAO')
+    parser.add_argument('--search-p95-ms', type=float, default=50.0,
+                        help='Бюджет p95 для StudentDAO.search; при превышении код возврата 1')
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args.iterations, args.concurrency, args.search_p95_ms, args.tag)) else 1)
+
+
+if __name__ == '__main__':
+    main()
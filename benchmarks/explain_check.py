@@ -0,0 +1,76 @@
+"""Проверка планов запросов: ни одна комбинация фильтров студентов не должна сканировать таблицу целиком.
+
+Завершается с ненулевым кодом, если в плане есть Seq Scan по students.
+
+    python -m benchmarks.explain_check
+"""
+import asyncio
+import itertools
+import json
+import sys
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.students.dao import StudentDAO
+
+FILTER_FIELDS = ('major_id', 'course', 'enrollment_year')
+
+
+def seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get('Node Type') == 'Seq Scan' and plan.get('Relation Name') == 'students':
+        found.append(plan['Relation Name'])
+    for child in plan.get('Plans', ()):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def explain(connection, query) -> dict:
+    compiled = query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    result = await connection.execute(text(f'EXPLAIN (FORMAT JSON) {compiled}'))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+async def student_plans(connection) -> list[tuple[str, dict]] | None:
+    # Планы всех комбинаций фильтров и поиска; None, если таблица пуста
+    sample = (await connection.execute(
+        text(f'SELECT {", ".join(FILTER_FIELDS)} FROM students ORDER BY random() LIMIT 1')
+    )).mappings().first()
+    if sample is None:
+        return None
+
+    checks = []
+    for size in range(1, len(FILTER_FIELDS) + 1):
+        for fields in itertools.combinations(FILTER_FIELDS, size):
+            filters = {field: sample[field] for field in fields}
+            checks.append((f'by_filter {fields}', StudentDAO._full_data_query(**filters)))
+            checks.append((f'page {fields}', StudentDAO._full_data_query(after_id=0, **filters).limit(101)))
+    checks.append(('search', StudentDAO._search_query('ива', limit=20, offset=0)))
+    return [(name, await explain(connection, query)) for name, query in checks]
+
+
+async def run() -> int:
+    failures = 0
+    async with engine.connect() as connection:
+        plans = await student_plans(connection)
+    await engine.dispose()
+    if plans is None:
+        raise SystemExit('Таблица students пуста - сначала запустите python -m benchmarks.seed')
+
+    for name, plan in plans:
+        status = 'SEQ SCAN' if seq_scans(plan) else 'ok'
+        failures += status != 'ok'
+        print(f'{status:8} {name}: {plan["Node Type"]}, cost={plan["Total Cost"]}')
+    return 1 if failures else 0
+
+
+def main():
+    sys.exit(asyncio.run(run()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""HTTP-сценарии нагрузки: пропускная способность и p50/p95/p99 по каждому сценарию.
+
+По умолчанию приложение запускается в этом же процессе через ASGI-транспорт httpx (без сети),
+с --base-url запросы идут в уже запущенный сервер.
+
+    python -m benchmarks.http_bench --iterations 500 --concurrency 50
+    python -m benchmarks.http_bench --base-url http://127.0.0.1:8000 --scenarios students_page,majors
+"""
+import asyncio
+import random
+import sys
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+from sqlalchemy import text
+
+from app.database import engine
+from benchmarks.common import base_parser, check_p95_budgets, measure, save_results, summarize
+
+BENCH_USER = {
+    "email": "bench@example.com",
+    "password": "bench-password",
+    "phone_number": "+70000000000",
+    "first_name": "Bench",
+    "last_name": "Runner",
+}
+
+
+@asynccontextmanager
+async def open_client(base_url: str | None):
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            yield client
+        return
+    from app.main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=60) as client:
+            yield client
+
+
+async def fetch(client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+    response = await client.get(url, **kwargs)
+    if response.status_code >= 400:
+        raise RuntimeError(f'{url}: {response.status_code} {response.text[:200]}')
+    return response
+
+
+async def scenario_compression(client, pages: int, page_size: int) -> dict:
+    # Байты "на проводе" и время отдачи списка студентов постранично для каждой кодировки
+    results = {}
+    for encoding in ('identity', 'gzip', 'br'):
+        total_bytes = 0
+        latencies = []
+        started = time.perf_counter()
+        cursor = None
+        for _ in range(pages):
+            params = {'limit': page_size}
+            if cursor:
+                params['cursor'] = cursor
+            request_started = time.perf_counter()
+            response = await fetch(client, '/students/', params=params, headers={'Accept-Encoding': encoding})
+            latencies.append(time.perf_counter() - request_started)
+            total_bytes += response.num_bytes_downloaded
+            cursor = response.json()['next_cursor']
+            if cursor is None:
+                break
+        results[encoding] = summarize(latencies, time.perf_counter() - started, bytes=total_bytes)
+    return results
+
+
+async def scenario_login_burst(client, logins: int, iterations: int, concurrency: int, probe_url) -> dict:
+    # p99 эндпоинта, которому нужна БД, пока параллельно идет шквал логинов с bcrypt:
+    # логины не должны удерживать соединения пула, пока ждут хэширования
+    response = await client.post('/auth/register/', json=BENCH_USER)
+    if response.status_code not in (200, 409):
+        raise RuntimeError(f'Не удалось зарегистрировать пользователя: {response.status_code} {response.text[:200]}')
+    credentials = {"email": BENCH_USER["email"], "password": BENCH_USER["password"]}
+
+    baseline = await measure(lambda i: fetch(client, probe_url()), iterations, concurrency)
+    rejected = 0
+
+    async def login(i):
+        nonlocal rejected
+        login_response = await client.post('/auth/login/', json=credentials)
+        if login_response.status_code == 503:
+            rejected += 1
+
+    burst = asyncio.gather(*(login(i) for i in range(logins)))
+    during_burst = await measure(lambda i: fetch(client, probe_url()), iterations, concurrency)
+    await burst
+    return {"probe_baseline": baseline, "probe_during_logins": during_burst, "logins_rejected": rejected}
+
+
+async def scenario_not_modified(client, url_for, iterations: int, concurrency: int) -> dict:
+    # Повторный опрос с If-None-Match: сервер должен отвечать 304 без тела
+    etags = {}
+
+    async def revalidate(i):
+        url = url_for(i)
+        headers = {'If-None-Match': etags[url]} if url in etags else {}
+        response = await client.get(url, headers=headers)
+        if response.status_code not in (200, 304):
+            raise RuntimeError(f'{url}: {response.status_code} {response.text[:200]}')
+        etags[url] = response.headers.get('etag', '')
+
+    for i in range(min(iterations, 50)):
+        await revalidate(i)
+    return await measure(revalidate, iterations, concurrency)
+
+
+async def run(args):
+    rng = random.Random(11)
+    async with engine.connect() as connection:
+        max_id = (await connection.execute(text('SELECT max(id) FROM students'))).scalar_one()
+        major_ids = list((await connection.execute(text('SELECT id FROM majors'))).scalars())
+    if not max_id:
+        raise SystemExit('Таблица students пуста - сначала запустите python -m benchmarks.seed')
+
+    iterations, concurrency = args.iterations, args.concurrency
+    scenarios = {
+        "students_page": lambda client: measure(
+            lambda i: fetch(client, '/students/', params={'limit': 100, 'after_id': rng.randint(0, max_id)}),
+            iterations, concurrency),
+        "students_filtered": lambda client: measure(
+            lambda i: fetch(client, '/students/', params={'major_id': rng.choice(major_ids),
+                                                          'course': rng.randint(1, 5)}),
+            iterations, concurrency),
+        "student_by_id": lambda client: measure(
+            lambda i: fetch(client, f'/students/{rng.randint(1, max_id)}'), iterations, concurrency),
+        "students_batch": lambda client: measure(
+            lambda i: fetch(client, '/students/batch', params={'ids': rng.sample(range(1, max_id + 1),
+                                                                                 min(100, max_id))}),
+            iterations, concurrency),
+        "student_not_modified": lambda client: scenario_not_modified(
+            client, lambda i: f'/students/{i % 50 + 1}', iterations, concurrency),
+        "majors_not_modified": lambda client: scenario_not_modified(
+            client, lambda i: '/majors/', iterations, concurrency),
+        "majors": lambda client: measure(lambda i: fetch(client, '/majors/'), iterations, concurrency),
+        "search": lambda client: measure(
+            lambda i: fetch(client, '/students/search', params={'q': rng.choice(('ива', 'петр', 'student12'))}),
+            iterations, concurrency),
+        "stats": lambda client: measure(
+            lambda i: fetch(client, '/stats/students', params={'group_by': ['major_id', 'course']}),
+            iterations, concurrency),
+        "students_html": lambda client: measure(lambda i: fetch(client, '/pages/students'), iterations, concurrency),
+        "export_csv": lambda client: measure(
+            lambda i: fetch(client, '/students/export.csv', params={'major_id': rng.choice(major_ids)}),
+            max(1, iterations // 20), 1),
+        "metrics_scrape": lambda client: measure(lambda i: fetch(client, '/metrics'), iterations, concurrency),
+        "compression": lambda client: scenario_compression(client, args.pages, args.page_size),
+        "login_burst": lambda client: scenario_login_burst(
+            client, args.logins, iterations, concurrency, lambda: f'/students/{rng.randint(1, max_id)}'),
+    }
+    selected = args.scenarios.split(',') if args.scenarios else list(scenarios)
+    unknown = set(selected) - set(scenarios)
+    if unknown:
+        raise SystemExit(f'Неизвестные сценарии: {", ".join(sorted(unknown))}')
+
+    results = {}
+    async with open_client(args.base_url) as client:
+        for name in selected:
+            print(f'  сценарий {name}...')
+            results[name] = await scenarios[name](client)
+    await engine.dispose()
+    save_results('http', {"iterations": iterations, "concurrency": concurrency, "students": max_id,
+                          "base_url": args.base_url or 'in-process'}, results, args.tag)
+    return check_p95_budgets(results, {"search": args.search_p95_ms})
+
+
+def main():
+    parser = base_parser('HTTP-сценарии нагрузки')
+    parser.add_argument('--base-url', help='Адрес запущенного сервера; по умолчанию приложение в этом процессе')
+    parser.add_argument('--scenarios', help='Список сценариев через запятую')
+    parser.add_argument('--pages', type=int, default=10, help='Страниц в сценарии compression')
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--logins', type=int, default=200, help='Параллельных логинов в сценарии login_burst')
+    parser.add_argument('--search-p95-ms', type=float, default=100.0,
+                        help='Бюджет p95 для /students/search; при превышении код возврата 1')
+    sys.exit(0 if asyncio.run(run(parser.parse_args())) else 1)
+
+
+if __name__ == '__main__':
+    main()
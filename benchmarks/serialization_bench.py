@@ -0,0 +1,57 @@
+"""Стоимость сериализации списка студентов: валидация pydantic против прямого orjson.
+
+Работает без БД.
+
+    python -m benchmarks.serialization_bench --rows 10000
+"""
+import argparse
+import time
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.students.schemas import SchemaStudent
+from benchmarks.common import add_tag_argument, save_results, summarize
+from benchmarks.seed import generate_students, STUDENT_COLUMNS
+
+
+def build_rows(count: int) -> list[dict]:
+    rows = []
+    for i, row in enumerate(generate_students(count, [1, 2, 3]), start=1):
+        data = dict(zip(STUDENT_COLUMNS, row))
+        data.pop('created_at')
+        data.pop('updated_at')
+        rows.append({"id": i, **data, "photo": None, "major": f'Факультет {data["major_id"]}'})
+    return rows
+
+
+def timed(operation, repeats: int) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        payload = operation()
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, time.perf_counter() - started, bytes=len(payload))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Стоимость сериализации списка студентов')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeats', type=int, default=20)
+    add_tag_argument(parser)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    adapter = TypeAdapter(list[SchemaStudent])
+    results = {
+        # Путь FastAPI с response_model: проверка каждой строки и повторная сериализация
+        "validated": timed(lambda: orjson.dumps(adapter.dump_python(adapter.validate_python(rows), mode='json')),
+                           args.repeats),
+        "trusted": timed(lambda: orjson.dumps(rows), args.repeats),
+    }
+    save_results('serialization', {"rows": args.rows, "repeats": args.repeats}, results, args.tag)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# Тесты с БД идут против настроенной в .env базы PostgreSQL с примененными миграциями
+# (alembic upgrade head) и пропускаются, если база недоступна. Свои данные тесты создают и удаляют сами.
+import os
+import uuid
+from datetime import date
+
+# До импорта приложения: хуки детектора N+1 вешаются на движок при его создании
+os.environ.setdefault('QUERY_DETECTOR_ENABLED', 'true')
+
+import httpx
+import pytest
+from sqlalchemy import delete, event, insert, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import engine
+from app.majors.cache import majors_cache
+from app.majors.models import Major, MajorCountDelta
+from app.students.models import Student
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+async def db():
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text('SELECT 1'))
+    except (OSError, SQLAlchemyError) as e:
+        await engine.dispose()
+        pytest.skip(f'PostgreSQL недоступен: {e}')
+    yield engine
+    # Соединения пула привязаны к циклу событий теста
+    await engine.dispose()
+
+
+@pytest.fixture
+async def seeded(db):
+    suffix = uuid.uuid4().hex[:8]
+    number = int(suffix, 16) % 10 ** 6
+    async with db.begin() as connection:
+        major_id = (await connection.execute(
+            insert(Major).values(major_name=f'Тестовый факультет {suffix}', major_description='Для тестов')
+            .returning(Major.id)
+        )).scalar_one()
+        student_ids = list((await connection.execute(insert(Student).returning(Student.id), [
+            {
+                "phone_number": f'+7999{number:06d}{i}',
+                "first_name": 'Тест',
+                "last_name": f'Студент{i}',
+                "date_of_birth": date(2000, 1, i + 1),
+                "email": f'test-{suffix}-{i}@example.com',
+                "address": 'г. Москва, ул. Тестовая, д. 1',
+                "enrollment_year": 2020,
+                "course": i + 1,
+                "major_id": major_id,
+            }
+            for i in range(3)
+        ])).scalars())
+    await majors_cache.refresh()
+
+    yield {"major_id": major_id, "student_ids": student_ids}
+
+    async with db.begin() as connection:
+        await connection.execute(delete(Student).where(Student.major_id == major_id))
+        await connection.execute(delete(MajorCountDelta).where(MajorCountDelta.major_id == major_id))
+        await connection.execute(delete(Major).where(Major.id == major_id))
+    majors_cache.invalidate()
+
+
+@pytest.fixture
+async def client():
+    from app.main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def statements(db):
+    # Все SQL-запросы к основной БД, выполненные за время теста
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(db.sync_engine, 'before_cursor_execute', before_cursor_execute)
+    yield executed
+    event.remove(db.sync_engine, 'before_cursor_execute', before_cursor_execute)
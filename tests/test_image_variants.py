@@ -0,0 +1,50 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from PIL import Image
+
+from app.images.variants import VariantCache
+
+pytestmark = pytest.mark.anyio
+
+
+class BrokenExecutor(Executor):
+    # Так выглядит пул, у которого упал рабочий процесс
+    def submit(self, fn, /, *args, **kwargs):
+        raise BrokenProcessPool('A child process terminated abruptly')
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'source.webp'
+    Image.new('RGB', (400, 300), 'red').save(path, format='WEBP')
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = VariantCache(directory=str(tmp_path / 'variants'), max_bytes=10 * 1024 * 1024, workers=1)
+    cache.load()
+    yield cache
+    cache.shutdown()
+
+
+async def test_variant_removed_from_disk_is_rendered_again(cache, source):
+    path = await cache.get(source, 'source-thumb.webp', 96)
+    os.remove(path)
+
+    assert await cache.get(source, 'source-thumb.webp', 96) == path
+    assert os.path.exists(path)
+    assert cache.total_bytes == os.path.getsize(path)
+
+
+async def test_broken_pool_is_replaced_and_render_retried(cache, source):
+    cache._executor = BrokenExecutor()
+
+    path = await cache.get(source, 'source-card.webp', 320)
+
+    assert isinstance(cache._executor, ProcessPoolExecutor)
+    with Image.open(path) as image:
+        assert max(image.size) == 320
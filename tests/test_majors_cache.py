@@ -0,0 +1,51 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.majors import cache as cache_module
+from app.majors.cache import MajorsCache
+
+pytestmark = pytest.mark.anyio
+
+
+def make_major(major_id: int) -> SimpleNamespace:
+    return SimpleNamespace(id=major_id, major_name=f'Факультет {major_id}', major_description=None,
+                           count_students=0, updated_at=datetime(2024, 1, 1))
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    # Содержимое таблицы majors и число обращений к ней
+    table = {"majors": [make_major(1)], "loads": 0}
+
+    async def find_all():
+        table["loads"] += 1
+        await asyncio.sleep(0.01)
+        return list(table["majors"])
+
+    monkeypatch.setattr(cache_module.MajorsDAO, 'find_all', find_all)
+    return table
+
+
+async def test_concurrent_unknown_major_reloads_once(stored):
+    cache = MajorsCache(ttl=60)
+    await cache.refresh()
+    # Факультет создали в другом процессе: все запросы видят незнакомый id одновременно
+    stored["majors"].append(make_major(2))
+
+    names = await asyncio.gather(*(cache.get_names({1, 2}) for _ in range(10)))
+
+    assert stored["loads"] == 2
+    assert all(result == {1: 'Факультет 1', 2: 'Факультет 2'} for result in names)
+
+
+async def test_missing_major_is_not_reloaded_by_every_waiter(stored):
+    cache = MajorsCache(ttl=60)
+    await cache.refresh()
+
+    names = await asyncio.gather(*(cache.get_names({1, 404}) for _ in range(10)))
+
+    assert stored["loads"] == 2
+    assert all(result == {1: 'Факультет 1'} for result in names)
@@ -0,0 +1,36 @@
+import time
+
+import pytest
+
+from app.monitoring.metrics import MetricsMiddleware, MetricsRegistry, RequestMetrics
+
+pytestmark = pytest.mark.anyio
+
+
+def test_overhead_includes_hook_time():
+    registry = MetricsRegistry(overhead_budget=1.0)
+    request_metrics = RequestMetrics()
+    request_metrics.overhead = 0.25
+
+    registry.record_request('GET', '/students/', 200, 0.01, request_metrics, time.perf_counter())
+
+    assert registry.overhead_total >= 0.25
+    assert registry.overhead_max >= 0.25
+
+
+async def test_middleware_records_route_status_and_overhead():
+    registry = MetricsRegistry(overhead_budget=1.0)
+
+    async def app(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 404, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def send(message):
+        pass
+
+    await MetricsMiddleware(app, registry)({'type': 'http', 'method': 'GET', 'path': '/nope'}, None, send)
+
+    rendered = '\n'.join(registry.render())
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"} 1' in rendered
+    assert registry.requests == 1
+    assert registry.overhead_total > 0
@@ -0,0 +1,104 @@
+# Каждый обработчик из app/students, app/majors и app/users прогоняется с порогом 1: ни один запрос
+# одной и той же формы не должен выполниться за HTTP-запрос дважды. Запрос на каждого студента
+# (N+1) на трех тестовых студентах сразу нарушит это условие.
+import uuid
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from app.majors.models import Major
+from app.monitoring.queries import inspect_queries
+from app.users.models import User
+
+pytestmark = pytest.mark.anyio
+
+
+async def request_without_n_plus_one(client, method: str, url: str, **kwargs):
+    with inspect_queries(route=f'{method} {url}', threshold=1) as tracker:
+        response = await client.request(method, url, **kwargs)
+    assert response.status_code < 400, response.text
+    tracker.assert_no_n_plus_one()
+    return response
+
+
+def student_payload(major_id: int) -> dict:
+    number = uuid.uuid4().int % 10 ** 7
+    return {
+        "phone_number": f'+7998{number:07d}',
+        "first_name": 'Тест',
+        "last_name": 'Добавленный',
+        "date_of_birth": '2001-02-03',
+        "email": f'added-{number}@example.com',
+        "address": 'г. Москва, ул. Тестовая, д. 2',
+        "enrollment_year": 2021,
+        "major_id": major_id,
+        "course": 2,
+    }
+
+
+async def test_students_read_endpoints(client, seeded):
+    major_id = seeded['major_id']
+    student_ids = seeded['student_ids']
+
+    await request_without_n_plus_one(client, 'GET', '/students/', params={'major_id': major_id})
+    await request_without_n_plus_one(client, 'GET', '/students/', params={'major_id': major_id},
+                                     headers={'Accept': 'application/x-ndjson'})
+    await request_without_n_plus_one(client, 'GET', '/students/by_filter', params={'student_id': student_ids[0]})
+    await request_without_n_plus_one(client, 'GET', '/students/export.csv', params={'major_id': major_id})
+    await request_without_n_plus_one(client, 'GET', '/students/search', params={'q': 'студент'})
+    await request_without_n_plus_one(client, 'GET', '/students/batch', params={'ids': student_ids})
+    await request_without_n_plus_one(client, 'GET', f'/students/{student_ids[0]}')
+
+
+async def test_students_write_endpoints(client, seeded):
+    major_id = seeded['major_id']
+    student_id = seeded['student_ids'][0]
+
+    await request_without_n_plus_one(client, 'POST', '/students/add/', json=student_payload(major_id))
+    await request_without_n_plus_one(client, 'POST', '/students/bulk',
+                                     json=[student_payload(major_id) for _ in range(3)])
+    await request_without_n_plus_one(client, 'PUT', f'/students/{student_id}', params={'course': 4})
+    await request_without_n_plus_one(client, 'DELETE', f'/students/del/{student_id}')
+
+
+async def test_majors_endpoints(client, db):
+    name = f'Факультет N+1 {uuid.uuid4().hex[:8]}'
+    try:
+        await request_without_n_plus_one(client, 'POST', '/majors/add/',
+                                         json={"major_name": name, "major_description": 'Для тестов'})
+        await request_without_n_plus_one(client, 'GET', '/majors/')
+        await request_without_n_plus_one(client, 'GET', '/majors/export.csv')
+        await request_without_n_plus_one(client, 'PUT', '/majors/update_description/',
+                                         json={"major_name": name, "major_description": 'Обновлено'})
+        async with db.connect() as connection:
+            major_id = (await connection.execute(select(Major.id).where(Major.major_name == name))).scalar_one()
+        await request_without_n_plus_one(client, 'DELETE', f'/majors/major/{major_id}')
+    finally:
+        async with db.begin() as connection:
+            await connection.execute(delete(Major).where(Major.major_name == name))
+
+
+async def test_users_endpoints(client, db):
+    number = uuid.uuid4().int % 10 ** 7
+    user = {
+        "email": f'n-plus-one-{number}@example.com',
+        "password": 'test-password',
+        "phone_number": f'+7997{number:07d}',
+        "first_name": 'Тест',
+        "last_name": 'Админ',
+    }
+    try:
+        await request_without_n_plus_one(client, 'POST', '/auth/register/', json=user)
+        async with db.begin() as connection:
+            await connection.execute(update(User).where(User.email == user['email']).values(is_admin=True))
+
+        response = await request_without_n_plus_one(
+            client, 'POST', '/auth/login/', json={"email": user['email'], "password": user['password']})
+        client.cookies.set('users_access_token', response.json()['access_token'])
+
+        await request_without_n_plus_one(client, 'GET', '/auth/me/')
+        await request_without_n_plus_one(client, 'GET', '/auth/all_users/')
+        await request_without_n_plus_one(client, 'POST', '/auth/logout/')
+    finally:
+        async with db.begin() as connection:
+            await connection.execute(delete(User).where(User.email == user['email']))
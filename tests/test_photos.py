@@ -0,0 +1,63 @@
+import os
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.config import settings
+from app.students.photos import PHOTOS_DIR, read_photo_upload
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_photo_for_unknown_student_is_not_stored(client, db):
+    before = set(os.listdir(PHOTOS_DIR))
+    response = await client.post('/pages/add_photo', params={'student_id': 2 ** 31 - 1},
+                                 files={'file': ('photo.webp', b'not really an image', 'image/webp')})
+
+    assert response.status_code == 404
+    assert set(os.listdir(PHOTOS_DIR)) == before
+
+
+def multipart_request(body_chunks, headers=()):
+    boundary = b'photo-boundary'
+    scope = {'type': 'http', 'method': 'POST', 'path': '/pages/add_photo', 'query_string': b'',
+             'headers': [(b'content-type', b'multipart/form-data; boundary=' + boundary), *headers]}
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': True} for chunk in body_chunks]
+    messages.append({'type': 'http.request', 'body': b'', 'more_body': False})
+
+    async def receive():
+        return messages.pop(0)
+
+    return Request(scope, receive=receive), boundary
+
+
+async def test_declared_oversized_upload_rejected_before_reading():
+    request, _ = multipart_request([], headers=[(b'content-length', str(settings.PHOTO_MAX_SIZE * 10).encode())])
+
+    with pytest.raises(HTTPException) as error:
+        await read_photo_upload(request)
+    assert error.value.status_code == 413
+
+
+async def test_chunked_oversized_upload_rejected_while_streaming():
+    chunk = b'x' * (1024 * 1024)
+    head = (b'--photo-boundary\r\nContent-Disposition: form-data; name="file"; filename="a.webp"\r\n'
+            b'Content-Type: image/webp\r\n\r\n')
+    request, _ = multipart_request([head, *[chunk] * (settings.PHOTO_MAX_SIZE // len(chunk) + 2)])
+
+    with pytest.raises(HTTPException) as error:
+        await read_photo_upload(request)
+    assert error.value.status_code == 413
+
+
+async def test_small_upload_is_parsed():
+    body = (b'--photo-boundary\r\nContent-Disposition: form-data; name="file"; filename="a.webp"\r\n'
+            b'Content-Type: image/webp\r\n\r\nimage-bytes\r\n--photo-boundary--\r\n')
+    request, _ = multipart_request([body])
+
+    form, upload = await read_photo_upload(request)
+    try:
+        assert await upload.read() == b'image-bytes'
+    finally:
+        await form.close()
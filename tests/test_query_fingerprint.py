@@ -0,0 +1,44 @@
+import pytest
+
+from app.monitoring.queries import NPlusOneError, fingerprint, inspect_queries
+
+
+def test_in_lists_of_any_length_share_a_fingerprint():
+    one = fingerprint('SELECT students.id FROM students WHERE students.id IN ($1::INTEGER)')
+    three = fingerprint('SELECT students.id FROM students WHERE students.id IN ($1::INTEGER, $2::INTEGER, $3::INTEGER)')
+
+    assert one == three == 'SELECT students.id FROM students WHERE students.id IN (?+)'
+
+
+def test_asyncpg_casts_and_literals_are_replaced():
+    statement = ("SELECT * FROM students WHERE updated_at < $1::TIMESTAMP WITHOUT TIME ZONE "
+                 "AND email = 'a''b@example.com' AND course = 3 LIMIT $2::INTEGER")
+
+    assert fingerprint(statement) == 'SELECT * FROM students WHERE updated_at < ? AND email = ? AND course = ? LIMIT ?'
+
+
+def test_whitespace_is_normalised():
+    assert fingerprint('SELECT  majors.id\n  FROM majors\tWHERE majors.id = $1::INTEGER') == \
+        'SELECT majors.id FROM majors WHERE majors.id = ?'
+
+
+def test_different_shapes_stay_different():
+    assert fingerprint('SELECT a FROM students WHERE id = $1') != fingerprint('SELECT a FROM majors WHERE id = $1')
+
+
+def test_tracker_reports_repeated_shapes():
+    with inspect_queries(route='GET /students/', threshold=2) as tracker:
+        for student_id in range(3):
+            tracker.record(f'SELECT * FROM majors WHERE id = {student_id}')
+        tracker.record('SELECT * FROM students')
+
+    assert tracker.repeated() == {'SELECT * FROM majors WHERE id = ?': 3}
+    with pytest.raises(NPlusOneError):
+        tracker.assert_no_n_plus_one()
+
+
+def test_tracker_raises_on_repeat_when_asked():
+    with inspect_queries(threshold=1, raise_on_repeat=True) as tracker:
+        tracker.record('SELECT * FROM majors WHERE id = $1::INTEGER')
+        with pytest.raises(NPlusOneError):
+            tracker.record('SELECT * FROM majors WHERE id = $1::INTEGER')
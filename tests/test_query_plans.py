@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import insert, text
+
+from app.majors.models import Major
+from benchmarks.explain_check import seq_scans, student_plans
+from benchmarks.seed import STUDENT_COLUMNS, generate_students
+
+pytestmark = pytest.mark.anyio
+
+# На маленькой таблице последовательное чтение честно дешевле индекса, поэтому тест сам
+# заливает объем, при котором планировщик обязан выбирать индексы
+SEEDED_STUDENTS = 100_000
+# Номера и email из этого диапазона не пересекаются с benchmarks.seed и другими тестами
+SEED_OFFSET = 900_000_000
+
+
+async def test_student_filters_and_search_avoid_seq_scan(db):
+    async with db.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            major_ids = list((await connection.execute(
+                insert(Major).returning(Major.id),
+                [{"major_name": f'План {SEED_OFFSET}-{i}', "major_description": 'Для тестов'} for i in range(10)],
+            )).scalars())
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                'students', columns=STUDENT_COLUMNS,
+                records=list(generate_students(SEEDED_STUDENTS, major_ids, start=SEED_OFFSET)),
+            )
+            await connection.execute(text('ANALYZE students'))
+
+            plans = await student_plans(connection)
+        finally:
+            # Все данные и собранная статистика откатываются вместе с транзакцией
+            await transaction.rollback()
+
+    scanned = [name for name, plan in plans if seq_scans(plan)]
+    assert scanned == []
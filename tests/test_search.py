@@ -0,0 +1,10 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize('q', ['   ', ' a ', '\t\t'])
+async def test_blank_search_query_is_rejected(client, q):
+    response = await client.get('/students/search', params={'q': q})
+
+    assert response.status_code == 400
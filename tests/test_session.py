@@ -0,0 +1,49 @@
+import pytest
+
+from app.dao.session import call_after_commit, get_session, outside_request_session, request_session
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_after_commit_callbacks_wait_for_request_commit():
+    calls = []
+    dependency = request_session()
+    await dependency.__anext__()
+
+    call_after_commit(lambda: calls.append('invalidated'))
+    assert calls == []
+
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+    assert calls == ['invalidated']
+
+
+async def test_after_commit_callbacks_dropped_on_rollback():
+    calls = []
+    dependency = request_session()
+    await dependency.__anext__()
+
+    call_after_commit(lambda: calls.append('invalidated'))
+    with pytest.raises(RuntimeError):
+        await dependency.athrow(RuntimeError('handler failed'))
+    assert calls == []
+
+
+def test_after_commit_outside_request_runs_immediately():
+    calls = []
+    call_after_commit(lambda: calls.append('invalidated'))
+    assert calls == ['invalidated']
+
+
+async def test_outside_request_session_opens_short_session():
+    dependency = request_session()
+    request = await dependency.__anext__()
+
+    with outside_request_session():
+        async with get_session() as session:
+            assert session is not request
+    async with get_session() as session:
+        assert session is request
+
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
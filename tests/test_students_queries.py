@@ -0,0 +1,31 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_list_students_is_one_statement(client, seeded, statements):
+    response = await client.get('/students/', params={'major_id': seeded['major_id']})
+
+    assert response.status_code == 200
+    assert [item['id'] for item in response.json()['items']] == seeded['student_ids']
+    # Названия факультетов берутся из справочника в памяти, а не отдельным запросом на студента
+    assert len(statements) == 1
+
+
+async def test_get_student_is_one_statement(client, seeded, statements):
+    student_id = seeded['student_ids'][0]
+    response = await client.get(f'/students/{student_id}')
+
+    assert response.status_code == 200
+    assert response.json()['id'] == student_id
+    assert response.json()['major'] is not None
+    assert len(statements) == 1
+
+
+async def test_student_by_filter_is_one_statement(client, seeded, statements):
+    student_id = seeded['student_ids'][1]
+    response = await client.get('/students/by_filter', params={'student_id': student_id})
+
+    assert response.status_code == 200
+    assert response.json()['id'] == student_id
+    assert len(statements) == 1
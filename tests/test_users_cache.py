@@ -0,0 +1,35 @@
+from app.users.cache import UsersCache
+from app.users.schemas import SchemaUser
+
+
+def make_user(user_id: int, is_admin: bool = False) -> SchemaUser:
+    return SchemaUser(id=user_id, phone_number='+70000000001', first_name='Тест', last_name='Тестов',
+                      email='user@example.com', is_user=True, is_student=False, is_teacher=False,
+                      is_admin=is_admin, is_super_admin=False)
+
+
+def test_put_and_get_snapshot():
+    cache = UsersCache(maxsize=10, ttl=60)
+    cache.put(make_user(1), cache.generation)
+
+    assert cache.get(1).id == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_put_read_before_invalidation_is_dropped():
+    cache = UsersCache(maxsize=10, ttl=60)
+    generation = cache.generation
+    # Права пользователя изменили и сбросили кэш, пока старая запись читалась из БД
+    cache.invalidate(1)
+    cache.put(make_user(1, is_admin=True), generation)
+
+    assert cache.get(1) is None
+
+
+def test_lru_eviction():
+    cache = UsersCache(maxsize=2, ttl=60)
+    for user_id in (1, 2, 3):
+        cache.put(make_user(user_id), cache.generation)
+
+    assert cache.get(1) is None
+    assert cache.get(3) is not None